@@ -0,0 +1,165 @@
+"""Tag value conversion benchmark.
+
+Measures the functions of l5k.tag converting raw tag values, independently
+of parsing, for several kinds of values, each at a base size n and at 10n.
+The ratio of the two times is expected to be near 10 for conversions that
+scale linearly; the process exits with a nonzero status if any ratio
+exceeds the limit, identifying quadratic behavior. Run from the repository
+root:
+
+    python -m benchmarks.bench_convert [--runs N] [--limit RATIO]
+"""
+
+import argparse
+import collections
+import json
+import sys
+import time
+
+from l5k import (
+    aoi,
+    builtin,
+    datatype,
+    tag,
+)
+
+
+def udt(members, hidden=0):
+    """Creates a UDT of DINT members, with a given number of them hidden."""
+    return datatype.DataType(
+        members=collections.OrderedDict(
+            (
+                f"m{i}",
+                datatype.Member(
+                    datatype="DINT",
+                    attributes={"Hidden": "1"} if i < hidden else {},
+                ),
+            )
+            for i in range(members)
+        )
+    )
+
+
+def wide_udt(n):
+    """A UDT of n DINT members and eight bit members."""
+    dt = udt(n)
+    for bit in range(8):
+        dt.members[f"b{bit}"] = datatype.BitMember(target="m0", bit=bit)
+    raw = list(range(n))
+    return lambda: tag.struct_value({}, dt, raw)
+
+
+def deep_udt(n):
+    """A UDT nested n levels deep, each level adding a DINT member."""
+    datatypes = {}
+    for depth in range(n):
+        dt = udt(1)
+        if depth:
+            dt.members["inner"] = datatype.Member(datatype=f"udt{depth - 1}")
+        datatypes[f"udt{depth}"] = dt
+
+    raw = [0]
+    for _ in range(n - 1):
+        raw = [0, raw]
+    return lambda: tag.convert_value(datatypes, f"udt{n - 1}", None, raw)
+
+
+def array_3d(n):
+    """A three-dimensional DINT array of n x 10 x 10 elements."""
+    dim = (10, 10, n)
+    raw = list(range(n * 100))
+    return lambda: tag.array_value({}, "DINT", dim, raw)
+
+
+def aoi_bools(n):
+    """An AOI instance with n packed BOOL parameters and n DINT parameters."""
+    params = collections.OrderedDict()
+    for i in range(n):
+        params[f"b{i}"] = datatype.Member(datatype="BOOL")
+        params[f"d{i}"] = datatype.Member(datatype="DINT")
+    definition = aoi.AddOnInstruction(
+        attributes={},
+        parameters=params,
+        local_tags=collections.OrderedDict(),
+    )
+    raw = [-1] * (len(definition.packed_bools) + n)
+    return lambda: tag.aoi_value({}, definition, raw)
+
+
+def builtin_array(name, items):
+    """Creates a case for an array of a built-in structure."""
+
+    def case(n):
+        raw = [[-1] + [0] * (items - 1) for _ in range(n)]
+        return lambda: tag.array_value(builtin.BUILT_INS, name, (n,), raw)
+
+    case.__doc__ = f"A {name} array of n elements."
+    return case
+
+
+def strip_hidden(n):
+    """A UDT value of n members, half of which are hidden."""
+    dt = udt(n, hidden=n // 2)
+    value = {name: 0 for name in dt.members}
+    return lambda: tag.strip_hidden(dt, dict(value))
+
+
+# Cases keyed by name, each accepting a size and returning a function
+# performing the conversion, along with the base size.
+CASES = {
+    "wide_udt": (wide_udt, 5000),
+    "deep_udt": (deep_udt, 30),
+    "array_3d": (array_3d, 100),
+    "aoi_bools": (aoi_bools, 1000),
+    "timer_array": (builtin_array("TIMER", 3), 1000),
+    "counter_array": (builtin_array("COUNTER", 3), 1000),
+    "control_array": (builtin_array("CONTROL", 3), 1000),
+    "strip_hidden": (strip_hidden, 10000),
+}
+
+
+def measure(case, n, runs):
+    """Determines the fastest conversion time among several runs."""
+    times = []
+    for _ in range(runs):
+        # Cases are constructed for every run because raw values may be
+        # consumed by conversion.
+        convert = case(n)
+        start = time.perf_counter()
+        convert()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=20.0)
+    args = parser.parse_args()
+
+    results = {}
+    for name, (case, n) in CASES.items():
+        small = measure(case, n, args.runs)
+        large = measure(case, n * 10, args.runs)
+        results[name] = {
+            "n": n,
+            "time_s": small,
+            "time_10n_s": large,
+            "ratio": large / small,
+        }
+
+    result = {
+        "benchmark": "convert",
+        "python": sys.version,
+        "limit": args.limit,
+        "results": results,
+    }
+    print(json.dumps(result))
+
+    failed = [name for name, r in results.items() if r["ratio"] > args.limit]
+    if failed:
+        sys.exit(f"Nonlinear conversion time: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""Import-time benchmark.
+
+Measures the wall time of importing the l5k package in a fresh interpreter,
+along with the time to construct the grammar upon the first parse, which
+is deferred from import. Run from the repository root:
+
+    python -m benchmarks.bench_import [--runs N]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+
+# Statement measuring time within the child interpreter so interpreter
+# startup is excluded.
+_MEASURE = """
+import time
+start = time.perf_counter()
+import l5k
+imported = time.perf_counter()
+l5k.parse_string("IE_VER := 2.1; CONTROLLER c TAG END_TAG END_CONTROLLER")
+parsed = time.perf_counter()
+print(imported - start, parsed - imported)
+"""
+
+
+def measure():
+    """Measures import and first parse time in a new interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c", _MEASURE],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    imported, parsed = result.stdout.split()
+    return float(imported), float(parsed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+
+    samples = [measure() for _ in range(args.runs)]
+    result = {
+        "benchmark": "import",
+        "runs": args.runs,
+        "import_s": statistics.median(s[0] for s in samples),
+        "first_parse_s": statistics.median(s[1] for s in samples),
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
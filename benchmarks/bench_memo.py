@@ -0,0 +1,68 @@
+"""Memoization benchmark.
+
+Measures the parse time and peak memory allocated while parsing a synthetic
+source without memoization, and with several memoization sizes, along with
+the resulting hit rate of each component type. Run from the repository
+root:
+
+    python -m benchmarks.bench_memo [--programs N] [--runs N]
+"""
+
+import argparse
+import json
+import time
+import tracemalloc
+
+import l5k
+
+from . import synthetic
+
+
+# Memoization sizes compared to parsing without memoization.
+SIZES = [100, 1000, 10000]
+
+
+def measure(data, runs, memo):
+    """Determines the fastest parse time and peak memory of several runs."""
+    times = []
+    for _ in range(runs):
+        parser = l5k.Parser(memo=memo)
+        start = time.perf_counter()
+        parser.parse_bytes(data)
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured in a separate parse because tracing allocations
+    # affects the parse time.
+    parser = l5k.Parser(memo=memo)
+    tracemalloc.start()
+    try:
+        parser.parse_bytes(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "memo": memo,
+        "time_s": min(times),
+        "peak_bytes": peak,
+        "hit_rates": {k: s.hit_rate for k, s in parser.memo_stats.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, default=100)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic.generate(args.programs).encode("utf-8")
+    result = {
+        "benchmark": "memo",
+        "bytes": len(data),
+        "results": [measure(data, args.runs, memo) for memo in [None] + SIZES],
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
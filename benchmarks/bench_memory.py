@@ -0,0 +1,83 @@
+"""Parse memory benchmark.
+
+Measures the memory allocated by l5k.parse() for synthetic projects of
+increasing numbers of programs, as traced by tracemalloc: the peak during
+the parse, and the amount retained by the resulting Controller, along with
+the Controller's own estimate from memory_report(). Tag values are spilled
+to disk beyond the given spill budget, if any. Run from the repository
+root:
+
+    python -m benchmarks.bench_memory [--programs N [N ...]] [--spill-budget B]
+"""
+
+import argparse
+import dataclasses
+import gc
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+import l5k
+
+from . import synthetic
+
+
+def measure(filename, **options):
+    """Traces the memory allocated while parsing a file."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        ctl = l5k.parse(filename, **options)
+        gc.collect()
+        retained, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    report = ctl.memory_report()
+    return {
+        "peak_bytes": peak,
+        "retained_bytes": retained,
+        "report": dataclasses.asdict(report),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--spill-budget", type=int)
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "synthetic.L5K")
+
+        # The grammar is constructed upon the first parse, and retained
+        # afterwards, so it is excluded from measurements.
+        l5k.parse_string(synthetic.generate(1))
+
+        for programs in args.programs:
+            spec = synthetic.Spec(programs=programs)
+            data = synthetic.project(spec).encode("utf-8")
+            with open(filename, "wb") as f:
+                f.write(data)
+            tags = spec.tag_count()
+            result = measure(filename, spill_budget=args.spill_budget)
+            result["spec"] = dataclasses.asdict(spec)
+            result["bytes"] = len(data)
+            result["tags"] = tags
+            result["retained_bytes_per_tag"] = result["retained_bytes"] / tags
+            results.append(result)
+
+    result = {
+        "benchmark": "memory",
+        "python": sys.version,
+        "spill_budget": args.spill_budget,
+        "results": results,
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""End-to-end parse throughput benchmark.
+
+Measures the time for l5k.parse() to parse a synthetic L5K file, reporting
+throughput in MB/s and tags/s. The content of the file is set by options
+corresponding to the fields of synthetic.Spec, and results include the
+library version, so results of separate versions can be compared. Run
+from the repository root:
+
+    python -m benchmarks.bench_parse [--programs N] [--tags N] ... [--runs N]
+"""
+
+import argparse
+import dataclasses
+import json
+import os
+import sys
+import tempfile
+import time
+
+import l5k
+from l5k import cache
+
+from . import synthetic
+
+
+def measure(filename, runs):
+    """Determines the fastest parse time among several runs."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        l5k.parse(filename)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    for field in dataclasses.fields(synthetic.Spec):
+        option = "--" + field.name.replace("_", "-")
+        if field.type is bool:
+            parser.add_argument(option, action=argparse.BooleanOptionalAction)
+        else:
+            parser.add_argument(option, type=field.type)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    options = {
+        field.name: getattr(args, field.name)
+        for field in dataclasses.fields(synthetic.Spec)
+        if getattr(args, field.name) is not None
+    }
+    spec = synthetic.Spec(**options)
+    data = synthetic.project(spec).encode("utf-8")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "synthetic.L5K")
+        with open(filename, "wb") as f:
+            f.write(data)
+        elapsed = measure(filename, args.runs)
+
+    result = {
+        "benchmark": "parse",
+        "version": cache._version(),
+        "python": sys.version,
+        "spec": dataclasses.asdict(spec),
+        "bytes": len(data),
+        "tags": spec.tag_count(),
+        "time_s": elapsed,
+        "mb_per_s": len(data) / elapsed / 1e6,
+        "tags_per_s": spec.tag_count() / elapsed,
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Pipelined conversion benchmark.
+
+Measures the parse time and peak memory allocated while parsing a synthetic
+source with sequential tag value conversion, and with conversion pipelined
+through queues of several sizes. Conversion only overlaps parsing on
+free-threaded Python builds. Run from the repository root:
+
+    python -m benchmarks.bench_pipeline [--programs N] [--runs N]
+"""
+
+import argparse
+import json
+import sys
+import sysconfig
+import time
+import tracemalloc
+
+import l5k
+
+from . import synthetic
+
+
+# Queue sizes compared to sequential conversion.
+SIZES = [1, 4, 16]
+
+
+def measure(data, runs, pipeline):
+    """Determines the fastest parse time and peak memory of several runs."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        l5k.parse_bytes(data, pipeline=pipeline)
+        times.append(time.perf_counter() - start)
+
+    # Memory is measured in a separate parse because tracing allocations
+    # affects the parse time.
+    tracemalloc.start()
+    try:
+        l5k.parse_bytes(data, pipeline=pipeline)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"pipeline": pipeline, "time_s": min(times), "peak_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    spec = synthetic.Spec(programs=args.programs)
+    data = synthetic.project(spec).encode("utf-8")
+    result = {
+        "benchmark": "pipeline",
+        "python": sys.version,
+        "free_threaded": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+        "bytes": len(data),
+        "results": [measure(data, args.runs, size) for size in [None] + SIZES],
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
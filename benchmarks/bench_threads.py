@@ -0,0 +1,54 @@
+"""Thread scaling benchmark.
+
+Measures the time to parse a synthetic source containing many programs
+with 1, 2, 4, and 8 worker threads, along with a single-threaded baseline.
+Parsing only scales with threads on free-threaded Python builds. Run from
+the repository root:
+
+    python -m benchmarks.bench_threads [--programs N] [--runs N]
+"""
+
+import argparse
+import json
+import sys
+import sysconfig
+import time
+
+import l5k
+
+from . import synthetic
+
+
+def measure(data, runs, **options):
+    """Determines the fastest parse time among several runs."""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        l5k.parse_bytes(data, **options)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--programs", type=int, default=200)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    data = synthetic.generate(args.programs).encode("utf-8")
+    result = {
+        "benchmark": "threads",
+        "python": sys.version,
+        "free_threaded": bool(sysconfig.get_config_var("Py_GIL_DISABLED")),
+        "bytes": len(data),
+        "serial_s": measure(data, args.runs),
+        "threads_s": {
+            n: measure(data, args.runs, workers=n, executor="thread")
+            for n in (1, 2, 4, 8)
+        },
+    }
+    print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
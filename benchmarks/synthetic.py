@@ -0,0 +1,273 @@
+"""Synthetic L5K source generation for benchmarks.
+
+Sources are generated from a Spec listing the quantity of each kind of
+content, and are deterministic for a given Spec, including its seed, so
+results of different library versions are comparable.
+"""
+
+import dataclasses
+import random
+
+
+@dataclasses.dataclass
+class Spec:
+    """Dimensions of a synthetic project.
+
+    Tags cycle through several kinds: UDT instances nested udt_depth
+    levels deep, which must be at least one, DINT and TIMER arrays of
+    array_size elements, REALs, and AOI instances; arrays are omitted if
+    array_size is zero, and AOI instances if aois is zero. Each program
+    contains a ladder routine of rungs rungs, and, if nonzero, a structured
+    text routine of st_lines lines, a function block routine of fbd_sheets
+    sheets, and a sequential function chart routine if sfc is True.
+    """
+
+    programs: int = 10
+    tags: int = 50
+    controller_tags: int = 100
+    udt_depth: int = 2
+    udt_width: int = 4
+    array_size: int = 10
+    aois: int = 2
+    aoi_bools: int = 8
+    rungs: int = 50
+    st_lines: int = 20
+    fbd_sheets: int = 1
+    sfc: bool = True
+    modules: int = 10
+    seed: int = 0
+
+    def tag_count(self):
+        """Computes the total number of tags, in all scopes."""
+        return self.controller_tags + self.programs * self.tags
+
+
+# Sequential function chart routine, which exercises nested alternatives.
+_SFC = """SFC_ROUTINE sfc
+STEP (ID := 0, X := 120, Y := 100, Operand := step0)
+END_STEP
+TRANSITION (ID := 1, X := 120, Y := 200, Operand := tran0)
+CONDITION (LanguageType := ST)
+'t0.a > 0
+END_CONDITION
+END_TRANSITION
+BRANCH (ID := 2, Y := 300, BranchType := Simultaneous, BranchFlow := Diverge)
+LEG (ID := 3)
+END_LEG
+LEG (ID := 4)
+END_LEG
+END_BRANCH
+STOP (ID := 5, X := 120, Y := 400, Operand := stop0)
+END_STOP
+END_SFC_ROUTINE"""
+
+# I/O module, with configuration data.
+_MODULE = """MODULE {name} (Parent := "Local", ParentModPortId := 1,
+CatalogNumber := "1756-IB16", Vendor := 1, ProductType := 7, ProductCode := 14,
+Major := 3, Minor := 1, Slot := {slot}, Mode := 2#0000_0000_0000_0000)
+ConfigData := [{config}];
+END_MODULE"""
+
+# AOI; the BOOL inputs are packed into DINTs along with EnableIn and
+# EnableOut in instance values.
+_AOI = """ADD_ON_INSTRUCTION_DEFINITION {name} (Revision := "1.0")
+PARAMETERS
+EnableIn : BOOL (Usage := Input);
+EnableOut : BOOL (Usage := Output);
+{inputs}
+Value : DINT (Usage := Input);
+END_PARAMETERS
+LOCAL_TAGS
+Acc : REAL;
+END_LOCAL_TAGS
+ROUTINE Logic
+N: XIC(In0)ADD(Acc,Value,Acc)OTE(EnableOut);
+END_ROUTINE
+END_ADD_ON_INSTRUCTION_DEFINITION"""
+
+# Function block sheet adding two tags.
+_SHEET = """SHEET (Name := "{name}")
+IREF (ID := 0, X := 100, Y := 100, Operand := t0.m1)
+END_IREF
+IREF (ID := 1, X := 100, Y := 200, Operand := t1.m1)
+END_IREF
+ADD_FUNCTION (ID := 2, X := 200, Y := 150)
+END_ADD_FUNCTION
+OREF (ID := 3, X := 300, Y := 150, Operand := t2.m1)
+END_OREF
+WIRE (FromElementID := 0, ToElementID := 2, ToParameter := SourceA)
+END_WIRE
+WIRE (FromElementID := 1, ToElementID := 2, ToParameter := SourceB)
+END_WIRE
+WIRE (FromElementID := 2, FromParameter := Dest, ToElementID := 3)
+END_WIRE
+END_SHEET"""
+
+
+class _Generator:
+    """Produces the lines of a source for a Spec."""
+
+    def __init__(self, spec):
+        self.spec = spec
+        self.rng = random.Random(spec.seed)
+        self.lines = []
+
+        self.kinds = ["udt"]
+        if spec.array_size:
+            self.kinds.extend(["dint_array", "timer_array"])
+        self.kinds.append("real")
+        if spec.aois:
+            self.kinds.append("aoi")
+
+    def source(self):
+        """Generates the complete source."""
+        spec = self.spec
+        self.lines.append("IE_VER := 2.1;")
+        self.lines.append('CONTROLLER ctl (ProcessorType := "1756-L83E")')
+        for depth in range(spec.udt_depth):
+            self.datatype(depth)
+        for i in range(spec.modules):
+            self.module(i)
+        for i in range(spec.aois):
+            self.aoi(i)
+        self.tags("c", spec.controller_tags)
+        for i in range(spec.programs):
+            self.program(i)
+
+        self.lines.append("TASK MainTask (Type := CONTINUOUS, Rate := 10)")
+        self.lines.extend(f"prg{i};" for i in range(spec.programs))
+        self.lines.append("END_TASK")
+        self.lines.append("END_CONTROLLER")
+        return "\n".join(self.lines)
+
+    def datatype(self, depth):
+        """Defines a UDT containing the UDT of the previous depth, if any."""
+        self.lines.append(f"DATATYPE udt{depth} (FamilyType := NoFamily)")
+        if depth:
+            self.lines.append(f"udt{depth - 1} inner;")
+        for i in range(self.spec.udt_width):
+            self.lines.append(f"{'DINT' if i % 2 else 'REAL'} m{i};")
+        self.lines.append(f"SINT ZZZZZZZZZZudt{depth}0 (Hidden := 1);")
+        self.lines.append(f"BIT b0 ZZZZZZZZZZudt{depth}0 : 0;")
+        self.lines.append(f"BIT b1 ZZZZZZZZZZudt{depth}0 : 1;")
+        self.lines.append("END_DATATYPE")
+
+    def module(self, i):
+        """Defines an I/O module with configuration data."""
+        config = ",".join(str(self.rng.randrange(256)) for _ in range(32))
+        self.lines.append(_MODULE.format(name=f"mod{i}", slot=i + 1, config=config))
+
+    def aoi(self, i):
+        """Defines an AOI with a number of BOOL inputs."""
+        inputs = "\n".join(
+            f"In{b} : BOOL (Usage := Input);" for b in range(self.spec.aoi_bools)
+        )
+        self.lines.append(_AOI.format(name=f"aoi{i}", inputs=inputs))
+
+    def tags(self, prefix, count):
+        """Defines a TAG component."""
+        self.lines.append("TAG")
+        for i in range(count):
+            kind = self.kinds[i % len(self.kinds)]
+            datatype, value = getattr(self, f"_{kind}")()
+            self.lines.append(f"{prefix}{i} : {datatype} := {value};")
+        self.lines.append("END_TAG")
+
+    def _udt(self):
+        depth = self.spec.udt_depth - 1
+        return f"udt{depth}", self._udt_value(depth)
+
+    def _udt_value(self, depth):
+        """Creates the raw value of a UDT of a given depth."""
+        items = [self._udt_value(depth - 1)] if depth else []
+        for i in range(self.spec.udt_width):
+            items.append(self._real()[1] if i % 2 == 0 else self._dint())
+        items.append(str(self.rng.randrange(4)))
+        return f"[{','.join(items)}]"
+
+    def _dint(self):
+        return str(self.rng.randint(-100000, 100000))
+
+    def _real(self):
+        return "REAL", f"{self.rng.uniform(-1000, 1000):.3f}"
+
+    def _dint_array(self):
+        n = self.spec.array_size
+        return f"DINT[{n}]", f"[{','.join(self._dint() for _ in range(n))}]"
+
+    def _timer_array(self):
+        n = self.spec.array_size
+        items = (f"[0,{self.rng.randrange(10000)},0]" for _ in range(n))
+        return f"TIMER[{n}]", f"[{','.join(items)}]"
+
+    def _aoi(self):
+        bools = 2 + self.spec.aoi_bools
+        items = [
+            str(self.rng.getrandbits(min(bools - i, 31))) for i in range(0, bools, 32)
+        ]
+        items.extend([self._dint(), self._real()[1]])
+        return f"aoi{self.rng.randrange(self.spec.aois)}", f"[{','.join(items)}]"
+
+    def program(self, p):
+        """Defines a program with its tags and routines."""
+        spec = self.spec
+        self.lines.append(f'PROGRAM prg{p} (MAIN := "main", MODE := 0)')
+        self.tags("t", spec.tags)
+
+        self.lines.append("ROUTINE main")
+        for i in range(spec.rungs):
+            a, b, c = (self.rng.randrange(max(spec.tags, 1)) for _ in range(3))
+            if i % 5 == 0:
+                self.lines.append(f'RC: "Rung {i} of program {p}.";')
+            self.lines.append(f"N: XIC(t{a}.b0)[,XIO(t{b}.b1)]MOV(t{a}.m1,t{c}.m1);")
+        self.lines.append("END_ROUTINE")
+
+        if spec.st_lines:
+            self.lines.append("ST_ROUTINE st")
+            for i in range(spec.st_lines):
+                a, b = (self.rng.randrange(max(spec.tags, 1)) for _ in range(2))
+                self.lines.append(f"'t{a}.m1 := t{b}.m1 + {i}; // Line {i}")
+            self.lines.append("END_ST_ROUTINE")
+
+        if spec.fbd_sheets:
+            self.lines.append("FBD_ROUTINE fbd")
+            for s in range(spec.fbd_sheets):
+                self.sheet(s)
+            self.lines.append("END_FBD_ROUTINE")
+
+        if spec.sfc:
+            self.lines.append(_SFC)
+
+        self.lines.append("END_PROGRAM")
+
+    def sheet(self, s):
+        """Defines a function block sheet."""
+        self.lines.append(_SHEET.format(name=f"Sheet{s}"))
+
+
+def project(spec):
+    """Creates a source as described by a Spec."""
+    return _Generator(spec).source()
+
+
+def generate(programs, tags=50, rungs=50):
+    """Creates a source with a given number of programs.
+
+    Each program contains the given number of UDT tags, a ladder routine
+    with the given number of rungs, and a sequential function chart routine.
+    """
+    return project(
+        Spec(
+            programs=programs,
+            tags=tags,
+            controller_tags=0,
+            udt_depth=1,
+            udt_width=2,
+            array_size=0,
+            aois=0,
+            rungs=rungs,
+            st_lines=0,
+            fbd_sheets=0,
+            modules=0,
+        )
+    )
@@ -1,3 +1,21 @@
 """Top-level package initialization."""
 
-from .grammar import parse
+from .aio import (
+    aparse,
+    aparse_many,
+)
+from .cache import ParseCache
+from .cancel import (
+    ParseCancelled,
+    ParseTimeout,
+)
+from .parser import (
+    FeedParser,
+    Parser,
+    parse,
+    parse_bytes,
+    parse_stream,
+    parse_string,
+    reparse,
+)
+from .timing import ParseStats
@@ -0,0 +1,103 @@
+"""Command line interface."""
+
+import argparse
+import sys
+
+from . import cache
+
+
+# Multipliers for size suffixes.
+_SIZE_UNITS = {
+    "K": 1 << 10,
+    "M": 1 << 20,
+    "G": 1 << 30,
+}
+
+
+def _size(value):
+    """Converts a size argument, e.g., 500M, into a number of bytes."""
+    value = value.strip().upper()
+    try:
+        multiplier = _SIZE_UNITS[value[-1]]
+    except (IndexError, KeyError):
+        multiplier = 1
+    else:
+        value = value[:-1]
+
+    try:
+        return int(float(value) * multiplier)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"invalid size: {value!r}") from e
+
+
+def _cache_prune(args):
+    """Removes least-recently used entries from a parse cache."""
+    try:
+        removed, removed_bytes = cache.prune(args.directory, args.max_size)
+    except FileNotFoundError:
+        sys.exit(f"Cache directory not found: {args.directory}")
+    print(f"Removed {removed} entries, {removed_bytes} bytes.")
+
+
+def _profile(args):
+    """Prints the time spent matching each grammar expression."""
+    # Imported here as profiling constructs a separate grammar.
+    from . import profiler
+
+    stats = profiler.profile(args.file, complete=args.all)
+    print(
+        f"{'Expression':<32}{'Calls':>10}{'Matches':>10}{'Failures':>10}"
+        f"{'Time (s)':>10}{'Own (s)':>10}"
+    )
+    for s in stats[: args.limit]:
+        print(
+            f"{s.name:<32}{s.calls:>10}{s.matches:>10}{s.failures:>10}"
+            f"{s.time:>10.3f}{s.own_time:>10.3f}"
+        )
+
+
+def main(argv=None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(prog="l5k", description="L5K file tools.")
+    commands = parser.add_subparsers(required=True)
+
+    cache_parser = commands.add_parser("cache", help="Manage a parse cache.")
+    cache_commands = cache_parser.add_subparsers(required=True)
+
+    prune = cache_commands.add_parser(
+        "prune",
+        help="Remove least-recently used entries.",
+    )
+    prune.add_argument("directory", help="Cache directory.")
+    prune.add_argument(
+        "--max-size",
+        type=_size,
+        required=True,
+        help="Maximum total size to retain, e.g., 500M or 2G.",
+    )
+    prune.set_defaults(func=_cache_prune)
+
+    profile = commands.add_parser(
+        "profile",
+        help="Measure time spent matching each grammar expression.",
+    )
+    profile.add_argument("file", help="L5K file.")
+    profile.add_argument(
+        "--all",
+        action="store_true",
+        help="Parse all components, including those normally skipped.",
+    )
+    profile.add_argument(
+        "--limit",
+        type=int,
+        default=25,
+        help="Number of expressions listed, slowest first.",
+    )
+    profile.set_defaults(func=_profile)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+This module implements asyncio entry points, which parse in an executor so
+the event loop is not blocked.
+
+Parsing cannot be interrupted at an arbitrary point, so cancelling a parse
+sets a cancel event, which stops the parse in the executor at the next
+component boundary.
+"""
+
+import functools
+import threading
+
+from . import parser
+
+
+async def aparse(filename, loop_executor=None, **options):
+    """Parses an L5K file without blocking the event loop.
+
+    Reading and parsing the file are both done by loop_executor, which must
+    execute in threads of this process, e.g., a ThreadPoolExecutor, or the
+    event loop's default executor if None. Keyword arguments are options as
+    described by the Parser class, except cancel_event.
+    """
+    # Imported here as asyncio is slow to import, and only required by
+    # asyncio applications, which have already imported it.
+    import asyncio
+
+    cancel_event = threading.Event()
+    instance = parser._parser(dict(options, cancel_event=cancel_event))
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(
+        loop_executor,
+        functools.partial(instance.parse, filename),
+    )
+
+    try:
+        return await future
+    except asyncio.CancelledError:
+        cancel_event.set()
+        raise
+
+
+async def aparse_many(
+    filenames,
+    concurrency=4,
+    loop_executor=None,
+    return_exceptions=False,
+    **options,
+):
+    """Parses several L5K files, yielding results as they complete.
+
+    Up to concurrency files are parsed at a time, and a (filename,
+    Controller) tuple is yielded as each parse completes, regardless of the
+    order of filenames. An exception raised while parsing a file is raised
+    by the iterator, or, if return_exceptions is True, yielded in place of
+    the Controller. Remaining parses are cancelled when iteration ends
+    early. Other arguments are the same as aparse().
+    """
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def parse_one(filename):
+        async with semaphore:
+            try:
+                ctl = await aparse(filename, loop_executor, **options)
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                ctl = e
+        return filename, ctl
+
+    tasks = [asyncio.ensure_future(parse_one(f)) for f in filenames]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
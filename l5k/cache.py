@@ -0,0 +1,248 @@
+"""
+This module implements caches of parsed Controller objects, allowing
+repeated parsing of an unchanged source to be skipped.
+
+The persistent, on-disk cache keys entries by a hash of the source content
+and the library version, and stores them as pickles; a cache directory must
+therefore only be shared among trusted users. Entry modification times
+record the most recent use, which is used to evict the least-recently used
+entries.
+
+The in-process ParseCache keys entries by file status, avoiding reading
+the file altogether for unchanged files.
+"""
+
+import collections
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+from . import (
+    memory,
+    parser,
+)
+
+
+# Revision of the cached representation, incremented if cached objects
+# change in a way not reflected by the library version.
+FORMAT = 3
+
+# File name extension of cache entries.
+SUFFIX = ".pickle"
+
+# File name extension of entries being written.
+TMP_SUFFIX = ".tmp"
+
+# Seconds after which an entry being written is assumed to have been
+# abandoned, e.g., by an interrupted process, and is removed when pruning.
+TMP_AGE = 3600
+
+
+def _version():
+    """Determines the installed library version."""
+    # Imported here as importlib.metadata is slow to import, and only
+    # required when the persistent cache is used.
+    import importlib.metadata
+
+    try:
+        return importlib.metadata.version("l5k")
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+def key(data, components, convert_values=True):
+    """Computes the cache key for a given source content.
+
+    The components argument lists the component types parsed, and
+    convert_values is the Parser option of the same name; both are
+    included in the key because they alter the resulting Controller.
+    """
+    options = f"{_version()}:{FORMAT}:{components}:{convert_values}:"
+    digest = hashlib.sha256(options.encode())
+    digest.update(data)
+    return digest.hexdigest()
+
+
+def load(cache_dir, entry_key):
+    """Retrieves a cached Controller, returning None if not present."""
+    path = os.path.join(cache_dir, entry_key + SUFFIX)
+    try:
+        with open(path, "rb") as f:
+            ctl = pickle.load(f)
+
+    except FileNotFoundError:
+        return None
+
+    # Discard unreadable entries, e.g., truncated by a full disk, or
+    # referring to classes or attributes that no longer exist.
+    except Exception:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+        return None
+
+    # Record this access for least-recently used eviction.
+    os.utime(path)
+
+    return ctl
+
+
+def store(cache_dir, entry_key, ctl):
+    """Adds a Controller to the cache."""
+    os.makedirs(cache_dir, exist_ok=True)
+
+    # Entries are written to a temporary file, then renamed, so concurrent
+    # readers never encounter a partially written entry.
+    fd, tmp = tempfile.mkstemp(dir=cache_dir, suffix=TMP_SUFFIX)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(ctl, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, os.path.join(cache_dir, entry_key + SUFFIX))
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+def prune(cache_dir, max_bytes):
+    """Removes least-recently used entries until the cache fits a size.
+
+    Abandoned temporary files, left by interrupted writes, are also removed
+    regardless of size. Returns the number of files removed and their total
+    size in bytes.
+    """
+    entries = []
+    removed = 0
+    removed_bytes = 0
+    stale = time.time() - TMP_AGE
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if not entry.is_file():
+                continue
+            stat = entry.stat()
+            if entry.name.endswith(SUFFIX):
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+            elif entry.name.endswith(TMP_SUFFIX) and stat.st_mtime < stale:
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(entry.path)
+                    removed += 1
+                    removed_bytes += stat.st_size
+
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+
+    for _, size, path in entries:
+        if total <= max_bytes:
+            break
+        total -= size
+
+        # Entries may be removed concurrently, e.g., by load() in another
+        # process upon finding an unreadable entry.
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(path)
+            removed += 1
+            removed_bytes += size
+
+    return removed, removed_bytes
+
+
+class ParseCache:
+    """In-process cache of parsed Controller objects.
+
+    Files are identified by their path, and considered unchanged if their
+    modification time and size have not changed, in which case the
+    previously parsed Controller is returned if it was parsed with the same
+    options. Entries are evicted in
+    least-recently used order when either the number of entries exceeds
+    maxsize, or the estimated total size of all cached objects exceeds
+    max_bytes.
+
+    Cached Controller objects are shared by every caller retrieving them,
+    and must therefore not be modified. Instances may be used from
+    multiple threads.
+    """
+
+    def __init__(self, maxsize=128, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+
+        # Usage statistics.
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        # Estimated size of all cached objects.
+        self.nbytes = 0
+
+        # Entries keyed by path, in least to most recently used order;
+        # values are (signature, Controller, size) tuples.
+        self._entries = collections.OrderedDict()
+
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def parse(self, filename, **options):
+        """Parses an L5K file, returning a cached result if unchanged.
+
+        Additional keyword arguments are passed to l5k.parse() when the
+        file is parsed.
+        """
+        path = os.path.realpath(filename)
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size, repr(sorted(options.items())))
+
+        with self._lock:
+            try:
+                cached_signature, ctl, _ = self._entries[path]
+            except KeyError:
+                pass
+            else:
+                if cached_signature == signature:
+                    self._entries.move_to_end(path)
+                    self.hits += 1
+                    return ctl
+            self.misses += 1
+
+        # Parsing is done without holding the lock so other files can be
+        # retrieved in the meantime.
+        ctl = parser.parse(path, **options)
+        size = memory.deep_size(ctl)
+
+        with self._lock:
+            self._remove(path)
+
+            # Objects too large to ever fit are not cached.
+            if self.max_bytes is None or size <= self.max_bytes:
+                self._entries[path] = (signature, ctl, size)
+                self.nbytes += size
+                self._evict()
+
+        return ctl
+
+    def clear(self):
+        """Removes all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def _remove(self, path):
+        """Removes an entry, if present."""
+        try:
+            _, _, size = self._entries.pop(path)
+        except KeyError:
+            return
+        self.nbytes -= size
+
+    def _evict(self):
+        """Removes least-recently used entries until within limits."""
+        while self._entries and (
+            len(self._entries) > self.maxsize
+            or (self.max_bytes is not None and self.nbytes > self.max_bytes)
+        ):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
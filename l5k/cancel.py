@@ -0,0 +1,109 @@
+"""
+This module implements cooperative cancellation of parsing.
+
+Each parse activates a Budget in the executing thread, which is checked at
+component boundaries by the parser, while converting tag values, and by
+parse actions on frequently matched expressions, including while
+pyparsing evaluates alternatives, so a single pathological component
+cannot exceed the budget by much.
+"""
+
+import contextlib
+import threading
+import time
+
+
+class ParseCancelled(Exception):
+    """Raised when parsing is aborted by a cancellation request.
+
+    The offset attribute is the byte offset of the component being parsed
+    when parsing was aborted, and component is a (keyword, name) tuple
+    identifying it; both are None if parsing had not reached the first
+    component.
+    """
+
+    def __init__(self, message, offset=None, component=None):
+        self.reason = message
+        if offset is not None:
+            message = f"{message} Reached offset {offset}"
+            if component is not None:
+                message = f"{message}, {' '.join(filter(None, component))}"
+            message = f"{message}."
+        super().__init__(message)
+        self.offset = offset
+        self.component = component
+
+    def __reduce__(self):
+        # Retains the location when transferred from a worker process.
+        return type(self), (self.reason, self.offset, self.component)
+
+
+class ParseTimeout(ParseCancelled):
+    """Raised when parsing is aborted because the deadline has passed."""
+
+
+class Budget:
+    """Conditions under which a single parse is aborted.
+
+    The cancel_event is an object with an is_set() method, e.g.,
+    threading.Event, and deadline is a time.monotonic() value; either may
+    be None. The offset and component are the initial location reported
+    upon cancellation.
+    """
+
+    def __init__(self, cancel_event=None, deadline=None, offset=None, component=None):
+        self.cancel_event = cancel_event
+        self.deadline = deadline
+
+        # Location of the current component, reported upon cancellation.
+        self.offset = offset
+        self.component = component
+
+    def check(self):
+        """Raises an exception if parsing must be aborted."""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise ParseCancelled(
+                "Parsing was cancelled.",
+                self.offset,
+                self.component,
+            )
+
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ParseTimeout(
+                "Parsing deadline exceeded.",
+                self.offset,
+                self.component,
+            )
+
+
+# Budget of the parse executing in the current thread.
+_active = threading.local()
+
+
+@contextlib.contextmanager
+def active(budget):
+    """Activates a budget for the current thread."""
+    previous = getattr(_active, "budget", None)
+    _active.budget = budget
+    try:
+        yield budget
+    finally:
+        _active.budget = previous
+
+
+def checkpoint(*args):
+    """Checks the active budget, if any.
+
+    Arguments are ignored, allowing this to be used as a parse action.
+    """
+    budget = getattr(_active, "budget", None)
+    if budget is not None:
+        budget.check()
+
+
+def progress(offset, component):
+    """Records the location of the component being parsed."""
+    budget = getattr(_active, "budget", None)
+    if budget is not None:
+        budget.offset = offset
+        budget.component = component
@@ -1,9 +1,17 @@
 """Storage representation of the top-level Controller component."""
 
+import contextlib
 import copy
 import dataclasses
+import threading
 
-from . import builtin
+from . import (
+    builtin,
+    cancel,
+    memory,
+    spill,
+    timing,
+)
 
 
 @dataclasses.dataclass
@@ -17,27 +25,111 @@ class Controller:
     tags: dict
     programs: dict
 
+    # Digests of each stored component's source content, keyed by
+    # (keyword, name) tuples, used to identify modified components when
+    # parsing a revised source with l5k.reparse().
+    fingerprints: dict = dataclasses.field(
+        default_factory=dict,
+        repr=False,
+        compare=False,
+    )
+
     def __post_init__(self):
         # Tag values are converted after initialization because
         # data type definions are now available.
-        self._convert_tag_values()
-
-    def _convert_tag_values(self):
-        """Converts tag values across all scopes."""
-        # Combine built-in, AOIs, and user-defined types into a complete set of
-        # data types for value conversion.
-        datatypes = copy.copy(builtin.BUILT_INS)
-        datatypes.update(self.aois)
-        datatypes.update(self.datatypes)
-
-        # Controller tags
-        for t in self.tags.values():
-            t.convert_value(datatypes)
-
-        # Program tags
-        for prg in self.programs.values():
-            for tag in prg.tags.values():
+        if getattr(_converting, "enabled", True):
+            with timing.measure("assemble", ("CONTROLLER", self.name)) as event:
+                event.objects = self.convert_values()
+
+    def convert_values(self, predicate=None):
+        """Converts raw tag values not yet converted, across all scopes.
+
+        This is only necessary for Controllers parsed with convert_values
+        set to False. If a predicate is given, only tags for which
+        predicate(scope, name, tag) is true are converted, where scope is
+        the program name, or None for controller tags, e.g.,
+        lambda scope, name, tag: tag.datatype == "TIMER". A single tag can
+        also be converted with tag.convert_value(ctl.datatype_table()).
+        Returns the number of tags selected.
+        """
+        datatypes = self.datatype_table()
+        group = timing.Group("convert")
+
+        scopes = [(None, self.tags)]
+        scopes.extend((name, prg.tags) for name, prg in self.programs.items())
+
+        count = 0
+        for scope, tags in scopes:
+            if predicate is None:
+                selected = tags.values()
+            else:
+                selected = [t for n, t in tags.items() if predicate(scope, n, t)]
+            count += convert_tags(selected, datatypes, group)
+
+        group.report()
+        return count
+
+    def datatype_table(self):
+        """Assembles all data type definitions available for value conversion.
+
+        Refer to the module-level datatype_table().
+        """
+        return datatype_table(self.datatypes, self.aois)
+
+    def memory_report(self):
+        """Estimates the memory used by this controller.
+
+        Returns a memory.MemoryReport; refer to memory.report().
+        """
+        return memory.report(self)
+
+
+# Set in threads creating Controllers without converting tag values.
+_converting = threading.local()
+
+
+@contextlib.contextmanager
+def converting(enabled):
+    """Enables or disables converting tag values of new Controllers.
+
+    This applies to Controllers created by the current thread, including
+    those created by the grammar's parse actions.
+    """
+    previous = getattr(_converting, "enabled", True)
+    _converting.enabled = enabled
+    try:
+        yield
+    finally:
+        _converting.enabled = previous
+
+
+def convert_tags(tags, datatypes, group):
+    """Converts the values of a sequence of tags not yet converted.
+
+    Conversion time is added to a timing.Group, by data type. Converted
+    values, including those converted previously, e.g., by workers, are
+    offered to the active spill.Spiller, if any. Returns the number of
+    tags.
+    """
+    count = 0
+    for tag in tags:
+        count += 1
+        cancel.checkpoint()
+        if not tag.converted:
+            with group.measure(("DATATYPE", tag.datatype)):
                 tag.convert_value(datatypes)
+        spill.offer(tag)
+    return count
+
+
+def datatype_table(datatypes, aois):
+    """Assembles all data type definitions available for value conversion."""
+    # Combine built-in, AOIs, and user-defined types into a complete set of
+    # data types for value conversion.
+    table = copy.copy(builtin.BUILT_INS)
+    table.update(aois)
+    table.update(datatypes)
+    return table
 
 
 def convert(tokens):
@@ -0,0 +1,122 @@
+"""
+This module implements bounded memoization of parse results, i.e., packrat
+parsing, limited to selected expressions.
+
+pyparsing's own packrat cache is global to all expressions in all threads,
+so it cannot be enabled for a single Parser, and is unbounded by default.
+Instead, expressions likely to be parsed repeatedly at the same location,
+e.g., alternatives of an Or, which are parsed once to select the longest
+match and again to produce the result, are wrapped with a Memo element.
+Memo elements only store results while a Cache has been activated in the
+current thread, and otherwise parse normally.
+"""
+
+import contextlib
+import dataclasses
+import threading
+
+import pyparsing as pp
+
+
+# Number of lookups required before a component type's hit rate is
+# evaluated to determine if memoization is worthwhile.
+SAMPLE_LOOKUPS = 1000
+
+# Minimum fraction of lookups that must be hits for memoization to remain
+# enabled; below this, the cost of storing results outweighs the savings.
+MIN_HIT_RATE = 0.05
+
+# Cache used by Memo elements in the current thread.
+_active = threading.local()
+
+
+@dataclasses.dataclass
+class Stats:
+    """Accumulated memoization statistics for a single component type."""
+
+    hits: int = 0
+    misses: int = 0
+
+    # Cleared if memoization was disabled due to a low hit rate.
+    enabled: bool = True
+
+    @property
+    def hit_rate(self):
+        """Fraction of lookups that found a stored result."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def update(self, cache):
+        """Adds the lookups from a completed parse.
+
+        Memoization is disabled if the sample size has been reached and the
+        hit rate is insufficient.
+        """
+        self.hits += cache.hits
+        self.misses += cache.misses
+        if self.hits + self.misses >= SAMPLE_LOOKUPS:
+            self.enabled = self.hit_rate >= MIN_HIT_RATE
+
+
+class Cache:
+    """Bounded storage of parse results for a single parse.
+
+    Results are keyed by location, so a cache must not be reused for a
+    different string. Once size entries are stored, the oldest entry is
+    discarded for each new entry.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+
+@contextlib.contextmanager
+def active(cache):
+    """Activates a cache for Memo elements in the current thread."""
+    previous = getattr(_active, "cache", None)
+    _active.cache = cache
+    try:
+        yield cache
+    finally:
+        _active.cache = previous
+
+
+class Memo(pp.ParseElementEnhance):
+    """Memoizes the results of an expression in the active cache."""
+
+    def parseImpl(self, instring, loc, do_actions=True):
+        cache = getattr(_active, "cache", None)
+        if cache is None:
+            return self.expr._parse(instring, loc, do_actions, callPreParse=False)
+
+        key = (self, loc, do_actions)
+        try:
+            value = cache.entries[key]
+
+        except KeyError:
+            cache.misses += 1
+            try:
+                end, tokens = self.expr._parse(
+                    instring, loc, do_actions, callPreParse=False
+                )
+            except pp.ParseBaseException as e:
+                _store(cache, key, e)
+                raise
+            _store(cache, key, (end, tokens.copy()))
+            return end, tokens
+
+        cache.hits += 1
+        if isinstance(value, Exception):
+            raise value
+        end, tokens = value
+        return end, tokens.copy()
+
+
+def _store(cache, key, value):
+    """Adds a result to a cache, discarding the oldest entry if full."""
+    if len(cache.entries) >= cache.size:
+        del cache.entries[next(iter(cache.entries))]
+    cache.entries[key] = value
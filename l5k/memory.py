@@ -0,0 +1,134 @@
+"""Memory usage estimation for parsed objects."""
+
+import dataclasses
+import sys
+
+
+@dataclasses.dataclass
+class MemoryReport:
+    """Estimated memory used by a parsed Controller, in bytes.
+
+    The total includes every object referenced by the controller, e.g., data
+    type definitions, while the remaining attributes are limited to tags
+    and programs. The controller attribute is the size of controller-scoped
+    tags, and programs contains the size of each program, including its
+    tags and attributes, keyed by program name. The datatypes dictionary
+    contains the size of the tags of each data type, across all scopes,
+    and categories divides the same into tag names, attributes, i.e., Tag
+    objects and everything they reference other than the value, and
+    values.
+
+    Values spilled to disk, refer to the spill module, are excluded from
+    all of the above; the spilled attribute is instead the size of their
+    pickled data in the spill store.
+    """
+
+    total: int = 0
+    controller: int = 0
+    programs: dict = dataclasses.field(default_factory=dict)
+    datatypes: dict = dataclasses.field(default_factory=dict)
+    categories: dict = dataclasses.field(
+        default_factory=lambda: dict.fromkeys(["names", "attributes", "values"], 0)
+    )
+    spilled: int = 0
+
+
+class _Sizer:
+    """Measures objects, counting each object only once across all calls."""
+
+    def __init__(self):
+        self.seen = set()
+
+    def size(self, obj):
+        """Measures an object and all objects it references not yet measured."""
+        total = 0
+        pending = [obj]
+
+        # Traversal uses an explicit stack instead of recursion because
+        # deeply nested values could otherwise exceed the recursion limit.
+        while pending:
+            item = pending.pop()
+            if id(item) in self.seen:
+                continue
+            self.seen.add(id(item))
+            total += sys.getsizeof(item)
+
+            if isinstance(item, dict):
+                pending.extend(item.keys())
+                pending.extend(item.values())
+            elif isinstance(item, (list, tuple, set, frozenset)):
+                pending.extend(item)
+            elif hasattr(item, "__dict__") and not isinstance(item, type):
+                attrs = vars(item)
+                pending.append(attrs)
+
+                # The spill.Store holding a spilled tag value is not walked
+                # as its values reside on disk.
+                spilled = attrs.get("_spilled")
+                if spilled is not None:
+                    self.seen.add(id(spilled[0]))
+
+        return total
+
+
+def deep_size(obj):
+    """Estimates the memory used by an object and all objects it references.
+
+    Objects referenced more than once are only counted once. The result is
+    an estimate as it excludes allocator overhead, and includes shared
+    objects, such as small integers, that are not exclusively owned.
+    """
+    return _Sizer().size(obj)
+
+
+def report(ctl):
+    """Estimates the memory used by a Controller, returning a MemoryReport.
+
+    Sizes are estimated as with deep_size(). Objects shared by several
+    tags, e.g., data type name strings, are counted only for the first tag
+    referencing them, so the parts of the report sum to the size of all
+    tags.
+    """
+    result = MemoryReport(total=deep_size(ctl))
+    sizer = _Sizer()
+
+    result.controller = _tags_size(sizer, ctl.tags, result)
+    for name, prg in ctl.programs.items():
+        size = _tags_size(sizer, prg.tags, result)
+        result.programs[name] = size + sizer.size(prg)
+
+    return result
+
+
+def _tags_size(sizer, tags, result):
+    """Measures a dictionary of tags, adding to the report's breakdowns.
+
+    Returns the size of the tags, including the containing dictionary,
+    which is excluded from the breakdowns.
+    """
+    total = sys.getsizeof(tags)
+    sizer.seen.add(id(tags))
+    categories = result.categories
+
+    for name, tag in tags.items():
+        names = sizer.size(name)
+
+        # Values are read directly, as the value property loads spilled
+        # values from their store.
+        spilled = tag.__dict__.get("_spilled")
+        if spilled is None:
+            values = sizer.size(tag.__dict__["_value"])
+        else:
+            store, key = spilled
+            result.spilled += store.size(key)
+            values = 0
+
+        attributes = sizer.size(tag)
+        categories["names"] += names
+        categories["values"] += values
+        categories["attributes"] += attributes
+
+        size = names + values + attributes
+        result.datatypes[tag.datatype] = result.datatypes.get(tag.datatype, 0) + size
+        total += size
+    return total
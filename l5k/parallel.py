@@ -0,0 +1,218 @@
+"""
+This module implements parsing and value conversion in worker threads or
+processes, allowing large sources to use several processors.
+
+Each worker receives the table of data type definitions once, via the pool
+initializer, instead of with every task; workers are therefore created only
+after all data type and AOI definitions have been parsed.
+
+Worker processes avoid contention for the global interpreter lock, at the
+expense of transferring each component and its result between processes.
+Worker threads share the parsed objects and the parser's grammar
+expressions directly, however, only parse concurrently on free-threaded
+Python builds.
+"""
+
+import contextlib
+import heapq
+import threading
+
+from . import (
+    cancel,
+    controller,
+    grammar,
+    memory,
+    timing,
+)
+
+
+# Names of the concurrent.futures executor classes selectable by name;
+# classes are resolved when a pool is created, as importing
+# concurrent.futures is slow.
+EXECUTORS = {
+    "process": "ProcessPoolExecutor",
+    "thread": "ThreadPoolExecutor",
+}
+
+# Seconds between checks for cancellation while waiting for a task.
+_POLL_INTERVAL = 0.05
+
+# State of the current worker, assigned by the pool initializer. This is
+# thread-local so pools of worker threads from concurrent parses, which may
+# have different data type definitions, do not interfere with each other.
+_worker = threading.local()
+
+
+def _init(datatypes, memo, expressions, cancel_event):
+    """Initializes a worker thread or process."""
+    _worker.datatypes = datatypes
+    _worker.memo = memo
+    _worker.cancel_event = cancel_event
+
+    # Worker processes cannot share the expressions of the parent process,
+    # and build their own.
+    if expressions is None:
+        expressions = grammar.Grammar(memo=memo is not None)
+    _worker.grammar = expressions
+
+
+def create_pool(
+    workers,
+    datatypes,
+    executor="process",
+    memo=None,
+    expressions=None,
+    cancel_event=None,
+):
+    """Creates a pool of workers.
+
+    The workers argument is the maximum number of workers, and datatypes
+    is the table of data type definitions, as created by
+    controller.datatype_table(), used to convert tag values, or None if
+    tag values are not converted. The executor argument selects worker
+    processes or threads; refer to EXECUTORS. The memo argument is the
+    memoization size, or None to disable memoization. Worker threads parse
+    with the given grammar.Grammar, which must match the memo argument; it
+    is ignored for worker processes. Tasks whose budget lacks a cancel
+    event observe the given cancel_event instead, which must be created
+    by context() for worker processes; refer to abort_event().
+    """
+    import concurrent.futures
+
+    options = {}
+    if executor != "thread":
+        expressions = None
+        options["mp_context"] = context()
+    return getattr(concurrent.futures, EXECUTORS[executor])(
+        workers,
+        initializer=_init,
+        initargs=(datatypes, memo, expressions, cancel_event),
+        **options,
+    )
+
+
+def abort_event(executor):
+    """Creates an event stopping the running tasks of a pool when set.
+
+    Only worker processes require this event, as the events of cancel
+    budgets cannot be transferred to them; returns None for threads, which
+    observe the parse's own cancel event.
+    """
+    if executor == "thread":
+        return None
+    return context().Event()
+
+
+def context():
+    """Selects the multiprocessing context used to start worker processes.
+
+    Forking a process while other threads are running, e.g., a
+    pipeline.Converter or the thread decompressing a source, may deadlock
+    the child, so processes are started by a fork server where available,
+    and spawned otherwise.
+    """
+    import multiprocessing
+
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+def parse_program(text, budget, record=False):
+    """Parses a PROGRAM component, including converting its tag values.
+
+    The budget is the cancel.Budget observed while parsing, and record
+    enables measurements; refer to the timing module. Returns a list of
+    (name, Program) tuples, and a list of measured events.
+    """
+    events = []
+    with (
+        cancel.active(_budget(budget)),
+        timing.active(events.append if record else None),
+    ):
+        nbytes = len(text.encode("utf-8")) if record else 0
+        with timing.measure("parse", budget.component, nbytes) as event:
+            with _memoize():
+                items = list(_worker.grammar.PROGRAM.parse_string(text, parse_all=True))
+            event.objects = len(items)
+
+        # Workers are given no definitions if values are not converted.
+        if _worker.datatypes is not None:
+            group = timing.Group("convert")
+            for _, prg in items:
+                controller.convert_tags(prg.tags.values(), _worker.datatypes, group)
+            group.report()
+
+    return items, events
+
+
+def _budget(budget):
+    """Adds the pool's cancel event to a task budget lacking one."""
+    if budget.cancel_event is None:
+        budget.cancel_event = getattr(_worker, "cancel_event", None)
+    return budget
+
+
+def _memoize():
+    """Activates a new memoization cache, if enabled for this worker."""
+    if _worker.memo is None:
+        return contextlib.nullcontext()
+
+    from . import memo
+
+    return memo.active(memo.Cache(_worker.memo))
+
+
+def convert_tags(items, budget, record=False):
+    """Converts the values of a list of (name, Tag) tuples.
+
+    The budget is the cancel.Budget observed while converting, and record
+    enables measurements; refer to the timing module. Returns the list of
+    converted tags, and a list of measured events.
+    """
+    events = []
+    with (
+        cancel.active(_budget(budget)),
+        timing.active(events.append if record else None),
+    ):
+        group = timing.Group("convert")
+        controller.convert_tags((tag for _, tag in items), _worker.datatypes, group)
+        group.report()
+    return items, events
+
+
+def result(future):
+    """Waits for the result of a task, checking the active budget meanwhile.
+
+    This allows cancellation while waiting for a worker process, which
+    cannot observe the parse's cancel event; refer to abort_event().
+    """
+    import concurrent.futures
+
+    while True:
+        cancel.checkpoint()
+        try:
+            return future.result(timeout=_POLL_INTERVAL)
+        except concurrent.futures.TimeoutError:
+            pass
+
+
+def partition(items, count):
+    """Divides (name, Tag) tuples into groups of similar conversion effort.
+
+    Effort is estimated by the size of each tag's raw value, and tags are
+    assigned, largest first, to the group with the smallest total, so a
+    few very large tags do not leave the remaining workers idle. Empty
+    groups are omitted.
+    """
+    sized = [(memory.deep_size(tag.value), name, tag) for name, tag in items]
+    sized.sort(key=lambda i: i[0], reverse=True)
+
+    groups = [[] for _ in range(count)]
+    totals = [(0, i) for i in range(count)]
+    for size, name, tag in sized:
+        total, i = heapq.heappop(totals)
+        groups[i].append((name, tag))
+        heapq.heappush(totals, (total + size, i))
+
+    return [g for g in groups if g]
@@ -0,0 +1,942 @@
+"""
+This module implements the entry points for parsing L5K sources into a
+Controller object.
+
+Sources are first divided into top-level components by the scan module,
+then only components whose content is stored, i.e., data types, AOIs, tags,
+and programs, are decoded and parsed with their respective expressions.
+All other components, e.g., modules and trends, are skipped without being
+decoded or parsed.
+"""
+
+import contextlib
+import hashlib
+import threading
+
+from . import (
+    cache,
+    cancel,
+    controller,
+    grammar,
+    parallel,
+    pipeline,
+    progress,
+    scan,
+    source,
+    spill,
+    timing,
+)
+
+
+# Expressions used to parse each stored component type, along with the
+# Controller attribute where the results are collected.
+_STORED = {
+    "DATATYPE": ("DATATYPE", "datatypes"),
+    "ADD_ON_INSTRUCTION_DEFINITION": ("aoi_definition", "aois"),
+    "TAG": ("TAG", "tags"),
+    "PROGRAM": ("PROGRAM", "programs"),
+}
+
+
+def parse(filename, **options):
+    """Parses an L5K file.
+
+    Keyword arguments are options as described by the Parser class.
+    """
+    return _parser(options).parse(filename)
+
+
+def parse_string(text, **options):
+    """Parses L5K content from a string."""
+    return _parser(options).parse_string(text)
+
+
+def parse_bytes(data, **options):
+    """Parses L5K content from UTF-8 encoded bytes."""
+    return _parser(options).parse_bytes(data)
+
+
+def parse_stream(stream, **options):
+    """Parses L5K content read from a file object."""
+    return _parser(options).parse_stream(stream)
+
+
+def reparse(previous, filename, **options):
+    """Parses a revised version of a previously parsed L5K file."""
+    return _parser(options).reparse(previous, filename)
+
+
+def _parser(options):
+    """Creates a Parser for the module-level parsing functions.
+
+    These all use the module-level grammar expressions instead of each
+    constructing their own.
+    """
+    parser = Parser(**options)
+    if parser.memo is None:
+        parser._grammar = grammar.shared
+    else:
+        parser._grammar = grammar.shared_memo
+    return parser
+
+
+class Parser:
+    """Parses L5K sources with a given set of options.
+
+    Each instance constructs its own grammar expressions upon first use, so
+    instances used by different threads share no parsing state. A single
+    instance may also be used by several threads, however, the cost of
+    constructing the grammar is then only incurred once.
+
+    If components is given, only the listed stored component types, e.g.,
+    ["TAG"], are parsed, and the resulting Controller omits all others.
+    Data type and AOI definitions are always parsed because they are
+    required to convert tag values.
+
+    If a cache directory is given, results are stored in a persistent
+    cache, and subsequent parses of a file with identical content return
+    the cached result instead of parsing the file again.
+
+    If workers is given, programs are parsed, and controller tag values
+    converted, in parallel by up to that many worker processes. This is
+    only beneficial for sources with many large programs or tags, as
+    starting the workers and transferring the results carries a
+    substantial cost. Worker threads are used instead if executor is
+    "thread", which avoids transferring the results, but only parse
+    concurrently on free-threaded Python builds.
+
+    If memo is given, results of expressions that are otherwise parsed
+    repeatedly at the same location are memoized, storing up to memo
+    entries while parsing each component. Hit rates are accumulated per
+    component type in memo_stats, and memoization is disabled for
+    component types where it is found to be ineffective; refer to the memo
+    module. Statistics exclude components parsed by workers. As statistics
+    are kept by the Parser, they only accumulate, and ineffective
+    memoization is only disabled, for a Parser used for several sources;
+    the module-level functions, e.g., l5k.parse(), create a new Parser for
+    every call.
+
+    If a cancel event, e.g., threading.Event, is given, parsing stops with
+    ParseCancelled shortly after the event is set, including tasks running
+    in worker processes, which are stopped once parsing is abandoned.
+    Similarly, if a deadline, expressed as a time.monotonic() value, is
+    given, parsing stops with ParseTimeout once the deadline has passed.
+    Refer to the cancel module.
+
+    If on_event is given, it is called with a timing.Event reporting the
+    time spent in each phase of parsing, e.g., parsing each component or
+    converting the tag values of each data type. A ParseStats object can
+    be given to accumulate the events. Refer to the timing module.
+
+    If on_progress is given, it is called with a progress.Progress object
+    reporting the offset reached and the component being parsed, at most
+    once every progress_interval seconds, and once upon completion. Refer
+    to the progress module.
+
+    If convert_values is False, tag values are left as raw lists of
+    atomic values, avoiding the cost of converting values that are never
+    used; values can be converted afterwards, selectively, with
+    Controller.convert_values().
+
+    If spill_budget is given, converted tag values are kept in memory until
+    their total estimated size reaches spill_budget bytes, and values
+    converted afterwards are moved to a temporary database in spill_dir, or
+    the default temporary directory if None, and loaded again each time
+    they are accessed. Tag values are then converted as each tag is parsed,
+    and the time spent converting is included in the measured parse time.
+    Refer to the spill module.
+
+    If pipeline is given, tag values of each TAG and PROGRAM component are
+    converted by a separate thread while the following components are
+    parsed, with up to pipeline components awaiting conversion; refer to
+    the pipeline module. This does not apply to a FeedParser with a
+    callback, which converts each component's tag values before passing
+    them to the callback.
+    """
+
+    def __init__(
+        self,
+        components=None,
+        cache_dir=None,
+        workers=None,
+        executor="process",
+        memo=None,
+        cancel_event=None,
+        deadline=None,
+        on_event=None,
+        on_progress=None,
+        progress_interval=0.5,
+        pipeline=None,
+        convert_values=True,
+        spill_budget=None,
+        spill_dir=None,
+    ):
+        if components is None:
+            components = _STORED.keys()
+        components = frozenset(components)
+        unknown = components - _STORED.keys()
+        if unknown:
+            raise ValueError(f"Unknown components: {', '.join(sorted(unknown))}.")
+        self.components = components | {"DATATYPE", "ADD_ON_INSTRUCTION_DEFINITION"}
+
+        if executor not in parallel.EXECUTORS:
+            raise ValueError(f"Unknown executor: {executor!r}.")
+
+        if memo is not None and memo < 1:
+            raise ValueError("Memoization size must be at least one.")
+
+        if pipeline is not None and pipeline < 1:
+            raise ValueError("Pipeline size must be at least one.")
+
+        self.cache_dir = cache_dir
+        self.workers = workers
+        self.executor = executor
+        self.memo = memo
+        self.cancel_event = cancel_event
+        self.deadline = deadline
+        self.on_event = on_event
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.pipeline = pipeline
+        self.convert_values = convert_values
+        self.spill_budget = spill_budget
+        self.spill_dir = spill_dir
+        self.memo_stats = {}
+        self._memo_lock = threading.Lock()
+        self._grammar = grammar.Grammar(memo=memo is not None)
+
+    def parse(self, filename):
+        """Parses an L5K file."""
+        with source.open_file(filename) as data:
+            if self.cache_dir is None:
+                return self._parse_data(data)
+
+            entry_key = cache.key(data, sorted(self.components), self.convert_values)
+            ctl = cache.load(self.cache_dir, entry_key)
+            if ctl is None:
+                ctl = self._parse_data(data)
+                cache.store(self.cache_dir, entry_key, ctl)
+
+        return ctl
+
+    def parse_string(self, text):
+        """Parses L5K content from a string."""
+        return self._parse_data(text.encode("utf-8"))
+
+    def parse_bytes(self, data):
+        """Parses L5K content from UTF-8 encoded bytes."""
+        return self._parse_data(data)
+
+    def parse_stream(self, stream):
+        """Parses L5K content read from a file object.
+
+        The stream may be opened in text or binary mode; binary streams must
+        contain UTF-8 encoded content.
+        """
+        with timing.active(self.on_event), timing.measure("read") as event:
+            data = stream.read()
+            event.nbytes = len(data)
+        if isinstance(data, str):
+            return self.parse_string(data)
+        return self.parse_bytes(data)
+
+    def reparse(self, previous, filename):
+        """Parses a revised version of a previously parsed L5K file.
+
+        Only components whose content differs from the source of the
+        previous Controller are parsed; data types, AOIs, tags, and programs
+        from unchanged components are reused from the previous Controller.
+        Unchanged tags are parsed again if the definition of their data type
+        changed so their values reflect the new definition.
+
+        The previous Controller shares the reused objects with the result,
+        and therefore should no longer be modified.
+        """
+        with source.open_file(filename) as data:
+            return self._parse_data(data, previous)
+
+    def _parse_data(self, data, previous=None):
+        """Parses the raw content of an L5K source."""
+        with (
+            cancel.active(self._budget()),
+            timing.active(self.on_event),
+            controller.converting(self.convert_values),
+            spill.active(self._spiller()),
+        ):
+            return self._parse_source(data, previous)
+
+    def _parse_source(self, data, previous=None):
+        """Parses the raw content of an L5K source within an active budget."""
+        import pyparsing as pp
+
+        stream = source.decompress(data)
+        if stream is not None:
+            # The chunk generator is closed first, stopping its reader thread
+            # before the stream is closed, even if parsing ends early.
+            with stream, contextlib.closing(source.read_ahead(stream)) as chunks:
+                return self._parse_chunks(chunks, previous)
+
+        reporter = self._reporter(len(data))
+        with progress.active(reporter):
+            try:
+                ctl = self._parse_components(data, previous)
+
+            # Content that cannot be divided into components, or a component
+            # that fails to parse individually, is parsed again with the
+            # complete grammar, which yields a result or an exception with
+            # an accurate location relative to the entire source.
+            except (scan.ScanError, pp.ParseBaseException):
+                ctl = self._parse_all(data)
+
+        if reporter is not None:
+            reporter.finish()
+        return ctl
+
+    def _parse_all(self, data):
+        """Parses an entire L5K source with the complete grammar."""
+        cancel.progress(0, ("CONTROLLER", None))
+        progress.enter(source.content_start(data), ("CONTROLLER", None))
+        cancel.checkpoint()
+        with timing.measure("parse", ("CONTROLLER", None), len(data)) as event:
+            text = source.decode(data, source.content_start(data), len(data))
+            with self._memoize("CONTROLLER"):
+                ctl = self._grammar.prj.parse_string(text)["controller"]
+            event.objects = 1
+
+        # The complete grammar always yields every component, so excluded
+        # components are removed afterwards.
+        for keyword, (_, attr) in _STORED.items():
+            if keyword not in self.components:
+                setattr(ctl, attr, {})
+
+        return ctl
+
+    def _parse_components(self, data, previous=None):
+        """Parses a complete L5K source component by component."""
+        with _Assembler(self, previous) as assembler:
+            assembler.feed(data, final=True)
+            return assembler.controller()
+
+    def _parse_chunks(self, chunks, previous=None):
+        """Parses an L5K source arriving as a sequence of byte chunks.
+
+        Each component is parsed as soon as it has been received in its
+        entirety, overlapping parsing with the production of later chunks,
+        e.g., decompression. Progress is reported without a total, as the
+        size of the content is unknown until all chunks are received.
+        """
+        feed_parser = FeedParser._create(self, previous)
+        reading = timing.Group("read")
+        chunks = iter(chunks)
+        while True:
+            with reading.measure(objects=0):
+                chunk = next(chunks, None)
+            if chunk is None:
+                break
+            reading.add(nbytes=len(chunk), objects=0)
+            feed_parser.feed(chunk)
+        reading.report()
+        return feed_parser.close()
+
+    def _reporter(self, total=None):
+        """Creates a progress reporter, if a callback was given."""
+        if self.on_progress is None:
+            return None
+        return progress.Reporter(self.on_progress, total, self.progress_interval)
+
+    def _spiller(self):
+        """Creates the spiller for a single parse, if a budget was given."""
+        if self.spill_budget is None:
+            return None
+        return spill.Spiller(self.spill_budget, self.spill_dir)
+
+    def _budget(self):
+        """Creates the cancellation conditions for a single parse."""
+        return cancel.Budget(self.cancel_event, self.deadline)
+
+    @contextlib.contextmanager
+    def _memoize(self, keyword):
+        """Enables memoization while parsing a component, if applicable."""
+        if self.memo is None:
+            yield
+            return
+
+        from . import memo
+
+        with self._memo_lock:
+            stats = self.memo_stats.setdefault(keyword, memo.Stats())
+
+        if not stats.enabled:
+            yield
+            return
+
+        cache = memo.Cache(self.memo)
+        with memo.active(cache):
+            yield
+
+        with self._memo_lock:
+            stats.update(cache)
+
+
+class FeedParser:
+    """Parses an L5K source supplied incrementally, e.g., from a socket.
+
+    Content is supplied with feed() in chunks of any size, and each data
+    type, AOI, tag, and program is parsed as soon as its component has been
+    received in its entirety, without waiting for the remaining content.
+    Content must be UTF-8 encoded and uncompressed.
+
+    If a callback is given, it is called with (attr, name, obj) for each
+    parsed object, where attr is the Controller attribute that will contain
+    the object, e.g., "datatypes"; tag values are converted before the
+    callback unless the convert_values option is False. To process objects
+    in another thread, the callback can add them to a queue, e.g.,
+    lambda *args: q.put(args). Programs parsed by workers are passed to the
+    callback when close() is called.
+
+    Keyword arguments are options as described by the Parser class.
+    """
+
+    def __init__(self, callback=None, **options):
+        self._start(_parser(options), callback)
+
+    @classmethod
+    def _create(cls, parser, previous=None):
+        """Creates an instance for a given Parser without a callback."""
+        feed_parser = cls.__new__(cls)
+        feed_parser._start(parser, None, previous)
+        return feed_parser
+
+    def _start(self, parser, callback, previous=None):
+        """Initializes a new instance."""
+        self._parser = parser
+        self._budget = parser._budget()
+        self._reporter = parser._reporter()
+        self._spiller = parser._spiller()
+        self._assembler = _Assembler(parser, previous, callback)
+        self._data = bytearray()
+
+        # Scanning for the next component restarts at the component's
+        # beginning, so attempts are deferred until the buffer has grown
+        # by at least the content remaining from the previous attempt to
+        # keep the total scanning effort linear.
+        self._retry = 0
+
+        # Set if the content could not be parsed component by component.
+        self._failed = False
+
+    def feed(self, data):
+        """Supplies the next portion of content."""
+        import pyparsing as pp
+
+        self._data += data
+        if self._failed or len(self._data) < self._retry:
+            return
+
+        try:
+            with self._activate():
+                self._assembler.feed(self._data, final=False)
+
+        # Parsing with the complete grammar is deferred until all content
+        # has been received, same as a complete source.
+        except (scan.ScanError, pp.ParseBaseException):
+            self._failed = True
+            self._assembler.close()
+            return
+
+        # Release workers if parsing is abandoned, e.g., cancelled.
+        except BaseException:
+            self._assembler.close()
+            raise
+
+        self._retry = len(self._data) + (len(self._data) - self._assembler.pos)
+
+    def close(self):
+        """Completes parsing after all content has been supplied.
+
+        Returns the resulting Controller.
+        """
+        try:
+            with self._activate():
+                ctl = self._complete()
+
+        finally:
+            with timing.active(self._parser.on_event):
+                self._assembler.close()
+
+        if self._reporter is not None:
+            self._reporter.finish(len(self._data))
+        return ctl
+
+    def _complete(self):
+        """Parses all remaining content, returning the Controller."""
+        import pyparsing as pp
+
+        if not self._failed:
+            try:
+                self._assembler.feed(self._data, final=True)
+                return self._assembler.controller()
+            except (scan.ScanError, pp.ParseBaseException):
+                pass
+
+        ctl = self._parser._parse_all(self._data)
+        self._assembler.emit_remaining(ctl)
+        return ctl
+
+    @contextlib.contextmanager
+    def _activate(self):
+        """Activates the budget, event callback, progress reporter, value
+        conversion option, and spiller.
+        """
+        with (
+            cancel.active(self._budget),
+            timing.active(self._parser.on_event),
+            progress.active(self._reporter),
+            controller.converting(self._parser.convert_values),
+            spill.active(self._spiller),
+        ):
+            yield
+
+
+class _Assembler:
+    """Collects individually parsed components into a Controller.
+
+    Components are parsed according to the options of the given Parser. If
+    a previously parsed Controller is given, components whose content is
+    identical to the previous source reuse the previous objects instead of
+    being parsed again.
+
+    If the Parser specifies a number of workers, programs and controller tag
+    value conversion are submitted to a pool of worker threads or
+    processes, and the Controller is assembled once all results have been
+    received. If the Parser specifies a pipeline, tag values of other TAG
+    and PROGRAM components are converted by a pipeline.Converter.
+
+    If a callback is given, it is called with each parsed object as
+    described by FeedParser.
+    """
+
+    def __init__(self, parser, previous=None, callback=None):
+        self.parser = parser
+        self.previous = previous
+        self.callback = callback
+        self.pool = None
+
+        # Set to stop tasks running in worker processes if parsing is
+        # abandoned; refer to parallel.abort_event().
+        self.abort = None
+
+        self.converter = None
+        self.head = None
+        self.stored = {attr: {} for _, attr in _STORED.values()}
+        self.fingerprints = {}
+
+        # Names of data types and AOIs parsed instead of reused.
+        self.modified_types = set()
+
+        # Names of all data types whose tag values must be converted again,
+        # determined once all definitions have been parsed.
+        self.affected_types = None
+
+        # Offset where scanning for the next component will begin.
+        self.pos = 0
+
+        # Set when the END_CONTROLLER keyword has been reached.
+        self.done = False
+
+        # (attr, name) tuples of objects passed to the callback.
+        self.emitted = set()
+
+        # Data type definitions for converting tag values before passing
+        # them to the callback, cleared when definitions are added.
+        self.datatypes = None
+
+        # Budgets given with tasks submitted to workers, keyed by future.
+        self.tasks = {}
+
+        # Time spent locating components, reported when closed.
+        self.scanning = timing.Group("scan")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Releases the workers, if any, and reports scanning time."""
+        self.scanning.report()
+
+        if self.converter is not None:
+            self.converter.close()
+            self.converter = None
+
+        # Pending tasks are cancelled, and running tasks are not awaited so
+        # an aborted parse returns promptly. Running tasks stop shortly as
+        # they observe the same budget, except the cancel event, which is
+        # replaced by the abort event for worker processes. Tasks have
+        # already completed if parsing was not abandoned.
+        if self.pool is not None:
+            if self.abort is not None:
+                self.abort.set()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    def feed(self, data, final):
+        """Parses all complete components not yet parsed.
+
+        The final parameter indicates if data contains the entire source;
+        if not, parsing stops at the first incomplete component, and will
+        resume from that component when called again with more content.
+        """
+        try:
+            if self.head is None:
+                self._parse_head(data, final)
+
+            if not self.done:
+                for span in self._scan(data, final):
+                    cancel.progress(span.start, (span.keyword, span.name))
+                    progress.enter(span.start, (span.keyword, span.name))
+                    cancel.checkpoint()
+                    self._parse_component(data, span)
+                    self.pos = span.end
+                self.done = True
+
+        except scan.Incomplete:
+            pass
+
+    def _scan(self, data, final):
+        """Yields spans of components following the current position."""
+        spans = scan.components(data, self.pos, final)
+        while True:
+            with self.scanning.measure(objects=0):
+                span = next(spans, None)
+            if span is None:
+                return
+            self.scanning.add(nbytes=span.end - span.start)
+            yield span
+
+    def _parse_head(self, data, final):
+        """Parses the content preceding the first component."""
+        start = source.content_start(data)
+        end = scan.head(data, start, final)
+        self.head = self.parser._grammar.prj_head.parse_string(
+            source.decode(data, start, end),
+            parse_all=True,
+        )
+        self.pos = end
+
+    def _parse_component(self, data, span):
+        """Parses a single component, storing the result if applicable."""
+        if span.keyword not in self.parser.components:
+            return
+        expr_name, attr = _STORED[span.keyword]
+
+        key = (span.keyword, span.name)
+        with memoryview(data) as view:
+            digest = hashlib.blake2b(view[span.start : span.end], digest_size=16)
+        self.fingerprints[key] = digest.digest()
+
+        if self._reusable(key, attr, span.name):
+            if attr == "tags":
+                items = self.previous.tags.items()
+            else:
+                items = [(span.name, getattr(self.previous, attr)[span.name])]
+
+        elif attr == "programs" and self.parser.workers is not None:
+            text = source.decode(data, span.start, span.end)
+            future = self._submit(
+                parallel.parse_program,
+                text,
+                self._task_budget(span.start, (span.keyword, span.name)),
+            )
+            items = [(span.name, future)]
+
+        else:
+            if attr in ("tags", "programs"):
+                self._spill_parsed()
+            expr = getattr(self.parser._grammar, expr_name)
+            nbytes = span.end - span.start
+            with timing.measure("parse", key, nbytes) as event:
+                text = source.decode(data, span.start, span.end)
+                with self.parser._memoize(span.keyword):
+                    items = list(expr.parse_string(text, parse_all=True))
+                event.objects = len(items)
+
+            if attr in ("datatypes", "aois"):
+                self.modified_types.update(name for name, _ in items)
+            else:
+                self._convert(span.start, key, attr, items)
+
+        self.stored[attr].update(items)
+        self._emit(attr, items)
+
+    def _emit(self, attr, items):
+        """Passes parsed objects to the callback."""
+        if self.callback is None:
+            return
+
+        if attr in ("datatypes", "aois"):
+            self.datatypes = None
+        elif self.datatypes is None:
+            self.datatypes = controller.datatype_table(
+                self.stored["datatypes"],
+                self.stored["aois"],
+            )
+
+        for name, obj in items:
+            # Programs parsed by workers are emitted once complete.
+            if self._pending(obj):
+                continue
+
+            if attr == "tags":
+                tags = [obj]
+            elif attr == "programs":
+                tags = obj.tags.values()
+            else:
+                tags = []
+
+            if self.parser.convert_values:
+                for tag in tags:
+                    tag.convert_value(self.datatypes)
+                    spill.offer(tag)
+
+            self.emitted.add((attr, name))
+            self.callback(attr, name, obj)
+
+    def emit_remaining(self, ctl):
+        """Passes objects not yet passed to the callback from a Controller."""
+        for attr in ("datatypes", "aois", "tags", "programs"):
+            items = [
+                (name, obj)
+                for name, obj in getattr(ctl, attr).items()
+                if (attr, name) not in self.emitted
+            ]
+            self._emit(attr, items)
+
+    def _spill_parsed(self):
+        """Enables converting and spilling tags as they are parsed."""
+        spiller = spill.current()
+        if (
+            spiller is None
+            or spiller.datatypes is not None
+            or not self.parser.convert_values
+        ):
+            return
+
+        # Tags and programs follow all data type and AOI definitions, so
+        # the definitions are complete when the first of them is parsed.
+        spiller.datatypes = controller.datatype_table(
+            self.stored["datatypes"],
+            self.stored["aois"],
+        )
+
+    def _convert(self, offset, component, attr, items):
+        """Queues parsed tag values for conversion, if pipelined."""
+        if (
+            self.parser.pipeline is None
+            or self.callback is not None
+            or not self.parser.convert_values
+        ):
+            return
+
+        if attr == "tags":
+            tags = [tag for _, tag in items]
+        else:
+            tags = [tag for _, prg in items for tag in prg.tags.values()]
+
+        # Tags and programs follow all data type and AOI definitions, so
+        # the definitions are complete when the converter is created.
+        if self.converter is None:
+            self.converter = pipeline.Converter(
+                controller.datatype_table(
+                    self.stored["datatypes"],
+                    self.stored["aois"],
+                ),
+                self.parser.pipeline,
+                self.parser.on_event is not None,
+                spill.current(),
+            )
+
+        budget = cancel.Budget(
+            self.parser.cancel_event,
+            self.parser.deadline,
+            offset,
+            component,
+        )
+        self.converter.put(tags, budget)
+
+    def _pool(self):
+        """Retrieves the worker process pool, creating it if necessary."""
+        # Programs follow all data type and AOI definitions, so the
+        # definitions given to the workers are complete when the first
+        # program is submitted. Workers are given no definitions if values
+        # are not converted.
+        if self.pool is None:
+            datatypes = None
+            if self.parser.convert_values:
+                datatypes = controller.datatype_table(
+                    self.stored["datatypes"],
+                    self.stored["aois"],
+                )
+            self.abort = parallel.abort_event(self.parser.executor)
+            self.pool = parallel.create_pool(
+                self.parser.workers,
+                datatypes,
+                self.parser.executor,
+                self.parser.memo,
+                self.parser._grammar,
+                self.abort,
+            )
+        return self.pool
+
+    def _task_budget(self, offset, component):
+        """Creates the cancellation conditions for a task given to workers."""
+        # Events cannot be transferred to worker processes with a task, so
+        # cancellation is instead detected while awaiting their results,
+        # and forwarded to them with the abort event.
+        if self.parser.executor == "thread":
+            event = self.parser.cancel_event
+        else:
+            event = None
+        return cancel.Budget(event, self.parser.deadline, offset, component)
+
+    def _pending(self, obj):
+        """Determines if an object is the result of a task given to workers."""
+        # Futures only exist if workers were created, so concurrent.futures,
+        # which is slow to import, is not imported otherwise.
+        if self.pool is None:
+            return False
+
+        import concurrent.futures
+
+        return isinstance(obj, concurrent.futures.Future)
+
+    def _submit(self, func, arg, budget):
+        """Submits a task to the workers."""
+        record = self.parser.on_event is not None
+        future = self._pool().submit(func, arg, budget, record)
+        self.tasks[future] = budget
+        return future
+
+    def _result(self, future):
+        """Waits for a task, reporting its location if parsing is aborted.
+
+        Events measured by the worker are reported once received.
+        """
+        budget = self.tasks.pop(future)
+        cancel.progress(budget.offset, budget.component)
+        result, events = parallel.result(future)
+        for event in events:
+            timing.report(event)
+        return result
+
+    def _tags(self):
+        """Collects controller tags, converting values in worker processes."""
+        tags = self.stored["tags"]
+        pending = [(name, tag) for name, tag in tags.items() if not tag.converted]
+        if self.parser.workers is None or not self.parser.convert_values or not pending:
+            return tags
+
+        futures = [
+            self._submit(
+                parallel.convert_tags,
+                group,
+                self._task_budget(self.pos, None),
+            )
+            for group in parallel.partition(pending, self.parser.workers)
+        ]
+
+        # Converted tags replace the originals in their existing order.
+        tags = dict(tags)
+        for future in futures:
+            tags.update(self._result(future))
+        return tags
+
+    def _programs(self):
+        """Collects programs, including those parsed by worker processes."""
+        programs = {}
+        for name, prg in self.stored["programs"].items():
+            if self._pending(prg):
+                result = self._result(prg)
+                programs.update(result)
+                self._emit("programs", result)
+            else:
+                programs[name] = prg
+        return programs
+
+    def _reusable(self, key, attr, name):
+        """Determines if a component can be reused from the previous source."""
+        if (
+            self.previous is None
+            or self.previous.fingerprints.get(key) != self.fingerprints[key]
+        ):
+            return False
+
+        if attr == "tags":
+            tags = self.previous.tags.values()
+        elif attr == "programs" and name in self.previous.programs:
+            tags = self.previous.programs[name].tags.values()
+        else:
+            return name in getattr(self.previous, attr)
+
+        # Tags with unchanged content must still be parsed again if the
+        # definition of their data type changed.
+        affected = self._affected_types()
+        return not any(t.datatype in affected for t in tags)
+
+    def _affected_types(self):
+        """Determines the data types whose values must be converted again."""
+        if self.affected_types is not None:
+            return self.affected_types
+
+        definitions = dict(self.stored["datatypes"])
+        definitions.update(self.stored["aois"])
+
+        previous = set(self.previous.datatypes)
+        previous.update(self.previous.aois)
+
+        # Start with modified and deleted definitions.
+        affected = self.modified_types | (previous - definitions.keys())
+
+        # Add definitions containing members of an affected type, repeating
+        # until no more definitions are added to account for nesting.
+        added = True
+        while added:
+            added = False
+            for name, definition in definitions.items():
+                if name not in affected and _member_types(definition) & affected:
+                    affected.add(name)
+                    added = True
+
+        self.affected_types = affected
+        return affected
+
+    def controller(self):
+        """Creates the Controller object from all parsed components."""
+        cancel.progress(self.pos, None)
+        if self.converter is not None:
+            for event in self.converter.finish():
+                timing.report(event)
+        stored = dict(
+            self.stored,
+            tags=self._tags(),
+            programs=self._programs(),
+        )
+        return controller.Controller(
+            self.head["name"],
+            self.head["attributes"][0],
+            fingerprints=self.fingerprints,
+            **stored,
+        )
+
+
+def _member_types(definition):
+    """Finds the data types of all members of a UDT or AOI definition."""
+    try:
+        members = definition.value_members
+    except AttributeError:
+        members = definition.members
+
+    # Bit members have no data type.
+    return {getattr(m, "datatype", None) for m in members.values()}
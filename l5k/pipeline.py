@@ -0,0 +1,103 @@
+"""
+This module implements converting tag values in a separate thread,
+overlapping conversion with parsing the components that follow.
+
+Parsed components are passed to the converting thread through a bounded
+queue, so parsing pauses if conversion falls behind, limiting the number
+of raw, i.e., unconverted, values held at once. Conversion only proceeds
+concurrently with parsing on free-threaded Python builds, otherwise the
+benefit is limited to the bounded number of raw values.
+"""
+
+import queue
+import threading
+
+from . import (
+    cancel,
+    controller,
+    spill,
+    timing,
+)
+
+
+class Converter:
+    """Converts the values of tags in a separate thread.
+
+    The datatypes argument is the table of data type definitions, as
+    created by controller.datatype_table(), size is the maximum number of
+    queued groups of tags, and record enables measurements; refer to the
+    timing module. Converted values are offered to the given
+    spill.Spiller, if any.
+    """
+
+    def __init__(self, datatypes, size, record=False, spiller=None):
+        self.datatypes = datatypes
+        self.queue = queue.Queue(size)
+        self.events = [] if record else None
+        self.spiller = spiller
+
+        # Exception raised by the thread, re-raised by the parsing thread.
+        self.error = None
+
+        # Set to discard remaining groups when parsing is abandoned.
+        self.stopped = False
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def put(self, tags, budget):
+        """Queues a sequence of tags for conversion.
+
+        The budget is the cancel.Budget observed while converting. Blocks
+        while the queue is full, and raises the exception of a previous
+        failed conversion, if any.
+        """
+        if self.error is not None:
+            raise self.error
+        self.queue.put((tags, budget))
+
+    def finish(self):
+        """Waits for all queued tags to be converted.
+
+        Returns the list of measured events, which is empty unless
+        measurements were enabled.
+        """
+        self._join()
+        if self.error is not None:
+            raise self.error
+        return self.events or []
+
+    def close(self):
+        """Stops the thread, discarding tags not yet converted."""
+        self.stopped = True
+        self._join()
+
+    def _join(self):
+        """Waits for the thread to process all queued items and exit."""
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def _run(self):
+        """Converts tags from the queue until stopped."""
+        on_event = None if self.events is None else self.events.append
+        with timing.active(on_event), spill.active(self.spiller):
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    return
+
+                # The queue is still drained after an error so the parsing
+                # thread never blocks on a full queue.
+                if self.error is not None or self.stopped:
+                    continue
+
+                tags, budget = item
+                try:
+                    with cancel.active(budget):
+                        group = timing.Group("convert")
+                        controller.convert_tags(tags, self.datatypes, group)
+                        group.report()
+                except BaseException as e:
+                    self.error = e
@@ -0,0 +1,159 @@
+"""
+This module implements profiling of individual grammar expressions,
+identifying the expressions where parsing a given source spends its time.
+
+Each named expression of a separate Grammar, e.g., attribute_list or rung,
+is given pyparsing debug actions recording every attempt to match it. The
+failure count is of particular interest: a high number of failures
+relative to matches reveals alternatives of an Or or MatchFirst that are
+repeatedly attempted and abandoned. Debug actions substantially slow
+parsing, so times are only meaningful relative to one another.
+"""
+
+import dataclasses
+import time
+
+import pyparsing as pp
+
+from . import (
+    grammar,
+    parser,
+    source,
+)
+
+
+@dataclasses.dataclass
+class ElementStats:
+    """Accumulated measurements of a single grammar expression.
+
+    The time attribute is the total time spent matching the expression,
+    including nested expressions, and own_time excludes time spent in
+    other named expressions, both in seconds. Time spent in recursive
+    matches of the same expression is included more than once in time.
+    """
+
+    name: str
+    calls: int = 0
+    matches: int = 0
+    failures: int = 0
+    time: float = 0.0
+    own_time: float = 0.0
+
+    @property
+    def failure_rate(self):
+        """Fraction of attempts that failed to match."""
+        return self.failures / self.calls if self.calls else 0.0
+
+
+class Profiler:
+    """Records attempts to match the named expressions of a Grammar.
+
+    Expressions appearing under several names, e.g., a module-level alias,
+    are recorded under the first name. Expressions defined by pyparsing,
+    e.g., pp.common.signed_integer, are shared with every other grammar,
+    so they are only recorded where this grammar uses a copy.
+    """
+
+    def __init__(self):
+        self.grammar = grammar.Grammar()
+
+        # Statistics keyed by expression name, and by id() of each
+        # expression object recorded under that name.
+        self.stats = {}
+        self._elements = {}
+
+        # (start time, time in nested expressions) for each attempt in
+        # progress, innermost last.
+        self._stack = []
+
+        # Constructs all expression groups.
+        self.grammar.prj
+
+        # Expressions given a results name, e.g., attribute_list("attributes"),
+        # are copies, which share the original's debug actions until new
+        # actions are assigned, identifying them as the named expression.
+        names = {}
+        roots = []
+        for name, expr in vars(self.grammar).items():
+            if isinstance(expr, pp.ParserElement):
+                names.setdefault(id(expr.debugActions), name)
+                roots.append(expr)
+
+        shared = {
+            id(expr)
+            for namespace in (vars(pp), vars(pp.common))
+            for expr in namespace.values()
+            if isinstance(expr, pp.ParserElement)
+        }
+
+        found = []
+        pending = roots
+        while pending:
+            expr = pending.pop()
+            if id(expr) in self._elements:
+                continue
+            name = names.get(id(expr.debugActions))
+            stats = None
+            if name is not None and id(expr) not in shared:
+                stats = self.stats.setdefault(name, ElementStats(name))
+                found.append(expr)
+            self._elements[id(expr)] = stats
+            pending.extend(expr.recurse())
+
+        # Actions are only assigned once all copies have been identified.
+        for expr in found:
+            expr.set_debug_actions(self._start, self._match, self._fail)
+
+    def parse(self, filename, complete=False):
+        """Parses an L5K file with the profiled expressions.
+
+        Only stored components are parsed unless complete is True, in which
+        case the entire source is parsed with the complete grammar,
+        including components that are otherwise skipped, e.g., modules.
+        Returns the resulting Controller.
+        """
+        p = parser.Parser()
+        p._grammar = self.grammar
+        if not complete:
+            return p.parse(filename)
+        with source.open_file(filename) as data:
+            return p._parse_all(data)
+
+    def results(self):
+        """Lists statistics of expressions attempted, by descending time."""
+        stats = [s for s in self.stats.values() if s.calls]
+        stats.sort(key=lambda s: s.time, reverse=True)
+        return stats
+
+    def _start(self, instring, loc, expr, cache_hit=False):
+        self._elements[id(expr)].calls += 1
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def _match(self, instring, start, end, expr, tokens, cache_hit=False):
+        self._elements[id(expr)].matches += 1
+        self._finish(expr)
+
+    def _fail(self, instring, loc, expr, exc, cache_hit=False):
+        self._elements[id(expr)].failures += 1
+        self._finish(expr)
+
+    def _finish(self, expr):
+        """Records the time of the innermost attempt upon completion."""
+        start, nested = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        stats = self._elements[id(expr)]
+        stats.time += elapsed
+        stats.own_time += elapsed - nested
+        if self._stack:
+            self._stack[-1][1] += elapsed
+
+
+def profile(filename, complete=False):
+    """Profiles parsing an L5K file.
+
+    Returns a list of ElementStats, ordered by descending time; refer to
+    Profiler.parse() for the complete argument.
+    """
+    profiler = Profiler()
+    profiler.parse(filename, complete)
+    return profiler.results()
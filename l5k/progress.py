@@ -0,0 +1,117 @@
+"""
+This module implements reporting the progress of lengthy parses.
+
+Progress is measured by the offset of the content being parsed, which
+advances at the start of each component, and within a component as
+frequently repeated statements, e.g., tag definitions or rungs, are
+parsed; offsets within a component are counted in characters, which only
+differ from bytes for non-ASCII content. Reports are throttled to a given
+interval, so the callback is called rarely regardless of the size of the
+source, and only the elapsed time is checked between reports.
+"""
+
+import contextlib
+import dataclasses
+import threading
+import time
+
+
+@dataclasses.dataclass
+class Progress:
+    """The position reached while parsing.
+
+    The offset is the number of bytes of content parsed, total is the size
+    of the content, or None if unknown, e.g., compressed or incrementally
+    supplied content, and component is a (keyword, name) tuple identifying
+    the component being parsed, e.g., ("PROGRAM", "MainProgram"), or None
+    once parsing has completed.
+    """
+
+    offset: int
+    total: int = None
+    component: tuple = None
+
+    @property
+    def fraction(self):
+        """Portion of the content parsed, or None if the total is unknown."""
+        if not self.total:
+            return None
+        return min(self.offset / self.total, 1.0)
+
+
+class Reporter:
+    """Passes Progress objects to a callback, at most once per interval.
+
+    The interval is in seconds.
+    """
+
+    def __init__(self, callback, total=None, interval=0.5):
+        self.callback = callback
+        self.total = total
+        self.interval = interval
+
+        # Location of the current component.
+        self.start = 0
+        self.component = None
+
+        # Greatest offset reached; offsets within a component may move
+        # backwards as pyparsing evaluates alternatives.
+        self.offset = 0
+
+        self.next_report = time.monotonic() + interval
+
+    def enter(self, offset, component):
+        """Records the beginning of a component."""
+        self.start = offset
+        self.component = component
+        self.update(offset)
+
+    def update(self, offset):
+        """Records the offset reached, reporting if the interval has elapsed."""
+        if offset > self.offset:
+            self.offset = offset
+        now = time.monotonic()
+        if now >= self.next_report:
+            self.next_report = now + self.interval
+            self.callback(Progress(self.offset, self.total, self.component))
+
+    def finish(self, total=None):
+        """Reports completion, regardless of the interval."""
+        if total is not None:
+            self.total = total
+        if self.total is not None:
+            self.offset = self.total
+        self.callback(Progress(self.offset, self.total))
+
+
+# Reporter of the parse executing in the current thread.
+_active = threading.local()
+
+
+@contextlib.contextmanager
+def active(reporter):
+    """Activates a reporter for the current thread; None disables reporting."""
+    previous = getattr(_active, "reporter", None)
+    _active.reporter = reporter
+    try:
+        yield reporter
+    finally:
+        _active.reporter = previous
+
+
+def enter(offset, component):
+    """Records the beginning of a component in the active reporter, if any."""
+    reporter = getattr(_active, "reporter", None)
+    if reporter is not None:
+        reporter.enter(offset, component)
+
+
+def advance(*args):
+    """Records the location reached within the current component.
+
+    This is a parse action; the location is the second argument, relative
+    to the beginning of the component's content.
+    """
+    reporter = getattr(_active, "reporter", None)
+    if reporter is not None:
+        reporter.update(reporter.start + args[1])
@@ -0,0 +1,164 @@
+"""
+This module locates the top-level components within the CONTROLLER
+component without parsing them. Each component is identified by the byte
+offsets of its starting and ending keywords, allowing components to be
+decoded and parsed individually, or skipped entirely if their content is
+not stored.
+
+Scanning operates on any bytes-like object supporting find(), rfind(), and
+slicing, e.g., bytes, bytearray, or mmap, so the source never needs to be
+decoded as a whole.
+"""
+
+import dataclasses
+import re
+
+
+# Components that may appear directly within the CONTROLLER component.
+COMPONENTS = frozenset([
+    b"DATATYPE",
+    b"MODULE",
+    b"ADD_ON_INSTRUCTION_DEFINITION",
+    b"ENCODED_DATA",
+    b"TAG",
+    b"PROGRAM",
+    b"TASK",
+    b"PARAMETER_CONNECTION",
+    b"TREND",
+    b"QUICK_WATCH",
+    b"AUTHENTICATION_CODE",
+    b"CONFIG",
+])
+
+# Components whose starting keyword is followed by a name.
+NAMED = frozenset([
+    b"DATATYPE",
+    b"MODULE",
+    b"ADD_ON_INSTRUCTION_DEFINITION",
+    b"PROGRAM",
+    b"TASK",
+    b"TREND",
+    b"AUTHENTICATION_CODE",
+    b"CONFIG",
+])
+
+# Everything preceding the first component: optional header comment,
+# version statement, and the controller's starting keyword, name, and
+# attribute list.
+_HEAD = re.compile(
+    rb"""\s*(?:\(\*.*?\*\))?
+    \s*IE_VER\s*:=\s*[\d.]+\s*;
+    \s*CONTROLLER\s+\w+
+    (?:\s*\((?:"[^"]*"|[^")])*\))?""",
+    re.DOTALL | re.VERBOSE,
+)
+
+# The next keyword following a component.
+_KEYWORD = re.compile(rb"\s*(\w+)")
+
+# Name following a component's starting keyword.
+_NAME = re.compile(rb"\s*([\w:$]+)")
+
+# Ending keywords for each component type.
+_END = {kw: re.compile(rb"\bEND_" + kw + rb"\b") for kw in COMPONENTS}
+
+
+class ScanError(Exception):
+    """Raised when the source cannot be divided into components."""
+
+
+class Incomplete(ScanError):
+    """Raised when more content is required to locate the next component.
+
+    This is only raised when scanning partial content, i.e., final is
+    False, such as while content is still being received.
+    """
+
+
+@dataclasses.dataclass(frozen=True)
+class Span:
+    """Location of a single top-level component."""
+
+    keyword: str
+    name: str
+    start: int
+    end: int
+
+
+def head(data, pos=0, final=True):
+    """Locates the end of the content preceding the first component.
+
+    The final parameter indicates if data contains the complete source;
+    partial content is only accepted if the first component's keyword has
+    been received, ensuring the controller's attribute list is complete.
+    """
+    match = _HEAD.match(data, pos)
+    if not match:
+        if final:
+            raise ScanError("Controller definition not found.")
+        raise Incomplete
+
+    if not final:
+        keyword = _KEYWORD.match(data, match.end())
+        if not keyword or keyword.end() == len(data):
+            raise Incomplete
+
+    return match.end()
+
+
+def components(data, pos, final=True):
+    """Yields spans for each component following the given offset.
+
+    Iteration ends after the END_CONTROLLER keyword. If data does not
+    contain the complete source, i.e., final is False, Incomplete is raised
+    when the remaining content does not contain a complete component.
+    """
+    while True:
+        match = _KEYWORD.match(data, pos)
+        if not match or (not final and match.end() == len(data)):
+            if final:
+                raise ScanError(f"Expected component at offset {pos}.")
+            raise Incomplete
+
+        keyword = match[1]
+        if keyword == b"END_CONTROLLER":
+            return
+
+        if keyword not in COMPONENTS:
+            raise ScanError(f"Unknown component {keyword!r} at offset {pos}.")
+
+        start = match.start(1)
+        pos = _find_end(data, keyword, match.end(), final)
+
+        name = None
+        if keyword in NAMED:
+            name_match = _NAME.match(data, match.end())
+            if name_match:
+                name = name_match[1].decode()
+
+        yield Span(keyword.decode(), name, start, pos)
+
+
+def _find_end(data, keyword, pos, final):
+    """Finds the offset immediately following a component's ending keyword.
+
+    Ending keywords appearing in a line after a quote are ignored as they
+    are part of a string or structured text, not the end of the component.
+    """
+    expr = _END[keyword]
+    while True:
+        match = expr.search(data, pos)
+
+        # A keyword at the very end of partial content may be the beginning
+        # of a longer word.
+        if not match or (not final and match.end() == len(data)):
+            if final:
+                raise ScanError(f"END_{keyword.decode()} not found.")
+            raise Incomplete
+
+        line_start = data.rfind(b"\n", 0, match.start()) + 1
+        prefix = data[line_start : match.start()]
+        if b"'" not in prefix and b'"' not in prefix:
+            return match.end()
+
+        pos = match.end()
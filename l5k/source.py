@@ -0,0 +1,148 @@
+"""Access to the raw content of L5K sources."""
+
+import bz2
+import codecs
+import contextlib
+import gzip
+import io
+import lzma
+import mmap
+import queue
+import threading
+
+
+# Size of each chunk read from a decompressing stream.
+CHUNK_SIZE = 1 << 20
+
+# Number of decompressed chunks that may be buffered ahead of the parser.
+READ_AHEAD = 8
+
+
+@contextlib.contextmanager
+def open_file(filename):
+    """Provides the content of a file as a read-only bytes-like object.
+
+    Files are memory-mapped so content is only read from disk as it is
+    accessed, and only the portions actually decoded consume memory as
+    Python strings.
+    """
+    with open(filename, "rb") as f:
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        # Empty files and non-regular files, e.g., pipes, cannot be mapped.
+        except (OSError, ValueError):
+            yield f.read()
+            return
+
+        with data:
+            yield data
+
+
+def content_start(data):
+    """Determines the offset of the first character following any BOM."""
+    if data[: len(codecs.BOM_UTF8)] == codecs.BOM_UTF8:
+        return len(codecs.BOM_UTF8)
+    return 0
+
+
+def decode(data, start, end):
+    """Decodes a region of the source into a string.
+
+    CPython's UTF-8 decoder takes an ASCII fast path, which covers the
+    vast majority of L5K content, while still handling non-ASCII
+    characters in descriptions and string values.
+    """
+    return data[start:end].decode("utf-8")
+
+
+def _open_zip(fileobj):
+    """Opens the L5K file contained in a zip archive."""
+    # Imported here as zipfile is slow to import, and rarely required.
+    import zipfile
+
+    archive = zipfile.ZipFile(fileobj)
+    members = [i for i in archive.infolist() if not i.is_dir()]
+
+    # Archives containing several files must have exactly one L5K file.
+    if len(members) > 1:
+        members = [i for i in members if i.filename.upper().endswith(".L5K")]
+
+    if len(members) != 1:
+        raise ValueError("Zip archive must contain exactly one L5K file.")
+
+    return archive.open(members[0])
+
+
+# Magic numbers identifying supported compression formats, along with the
+# function to open a decompressing stream from a binary file object.
+_COMPRESSION = [
+    (b"\x1f\x8b", gzip.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+    (b"BZh", bz2.open),
+    (b"PK\x03\x04", _open_zip),
+]
+
+
+def decompress(data):
+    """Opens a decompressing stream if the content is compressed.
+
+    Compression is identified by the format's magic number, regardless of
+    any file extension. None is returned for uncompressed content.
+    """
+    for magic, opener in _COMPRESSION:
+        if data[: len(magic)] == magic:
+            break
+    else:
+        return None
+
+    # Memory maps already provide a file interface; other bytes-like
+    # objects must be wrapped in a file object.
+    if not isinstance(data, mmap.mmap):
+        data = io.BytesIO(data)
+
+    data.seek(0)
+    return opener(data)
+
+
+def read_ahead(stream):
+    """Yields chunks read from a binary stream by a background thread.
+
+    This allows decompression, which releases the GIL, to overlap with
+    parsing the chunks that have already been decompressed.
+    """
+    chunks = queue.Queue(READ_AHEAD)
+    stop = threading.Event()
+
+    def reader():
+        try:
+            while not stop.is_set():
+                chunk = stream.read(CHUNK_SIZE)
+                chunks.put(chunk)
+                if not chunk:
+                    break
+
+        # Exceptions are passed to the consuming thread to be raised there.
+        except Exception as e:
+            chunks.put(e)
+
+    thread = threading.Thread(target=reader, daemon=True)
+    thread.start()
+
+    try:
+        while True:
+            chunk = chunks.get()
+            if isinstance(chunk, BaseException):
+                raise chunk
+            if not chunk:
+                break
+            yield chunk
+
+    # Unblock the reader if iteration ended early, e.g., parse error.
+    finally:
+        stop.set()
+        while thread.is_alive():
+            try:
+                chunks.get(timeout=0.1)
+            except queue.Empty:
+                pass
@@ -0,0 +1,178 @@
+"""
+This module implements spilling converted tag values to disk, allowing
+sources whose values exceed the available memory to be parsed.
+
+Values are kept in memory until their total estimated size reaches a
+budget; every value converted afterwards is pickled into a Store, an
+SQLite database in a temporary file, and the Tag retains only the key of
+its value, which is loaded again each time it is accessed. Names, data
+types, and attributes of all tags always remain in memory.
+
+Tags parsed in the current thread are converted, and spilled if needed, as
+each is parsed, rather than once its component is complete, so the peak
+memory used while parsing is not determined by the largest component.
+
+The store is removed once no tags refer to it. Pickling a Tag, e.g., to
+store a Controller in the parse cache, includes its value, which is loaded
+from the store.
+"""
+
+import contextlib
+import os
+import pickle
+import tempfile
+import threading
+import weakref
+
+from . import memory
+
+
+class Store:
+    """Storage for pickled values in an SQLite database.
+
+    The database is created in the given directory, or the default
+    temporary directory if None, and removed once the Store is no longer
+    referenced.
+    """
+
+    def __init__(self, directory=None):
+        # Imported here as sqlite3 is only required if values are spilled.
+        import sqlite3
+
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite", dir=directory)
+        os.close(fd)
+
+        # Values are only read by this connection, which observes its own
+        # uncommitted changes, so nothing is committed or synchronized.
+        self.connection = sqlite3.connect(self.path, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode = OFF")
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.connection.execute(
+            "CREATE TABLE value (key INTEGER PRIMARY KEY, data BLOB NOT NULL)"
+        )
+        self.lock = threading.Lock()
+        self._finalizer = weakref.finalize(
+            self, _remove, self.connection, self.path
+        )
+
+    def put(self, value):
+        """Stores a value, returning its key."""
+        data = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self.lock:
+            cursor = self.connection.execute(
+                "INSERT INTO value (data) VALUES (?)", (data,)
+            )
+        return cursor.lastrowid
+
+    def get(self, key):
+        """Loads a stored value."""
+        with self.lock:
+            (data,) = self.connection.execute(
+                "SELECT data FROM value WHERE key = ?", (key,)
+            ).fetchone()
+        return pickle.loads(data)
+
+    def size(self, key):
+        """Determines the size of a stored value's pickled data, in bytes."""
+        with self.lock:
+            (size,) = self.connection.execute(
+                "SELECT length(data) FROM value WHERE key = ?", (key,)
+            ).fetchone()
+        return size
+
+    def close(self):
+        """Removes the database; stored values are no longer available."""
+        self._finalizer()
+
+
+def _remove(connection, path):
+    """Closes and deletes a Store's database."""
+    connection.close()
+    with contextlib.suppress(FileNotFoundError):
+        os.remove(path)
+
+
+class Spiller:
+    """Decides which converted tag values are moved to a Store.
+
+    The budget is the total size, in bytes as estimated by
+    memory.deep_size(), of values kept in memory; values converted after
+    the budget is reached are spilled to a Store created in the given
+    directory upon the first spilled value.
+    """
+
+    def __init__(self, budget, directory=None):
+        self.budget = budget
+        self.directory = directory
+        self.store = None
+
+        # Table of data type definitions, as created by
+        # controller.datatype_table(), assigned once all definitions have
+        # been parsed; refer to parsed().
+        self.datatypes = None
+
+        # Total size of values kept in memory, and id() of their tags, as
+        # the same tag may be offered more than once.
+        self.resident = 0
+        self.kept = set()
+
+        # Values may be offered by several threads, e.g., a
+        # pipeline.Converter.
+        self.lock = threading.Lock()
+
+    def offer(self, tag):
+        """Spills the value of a converted tag if the budget is exhausted."""
+        if not tag.converted or tag.spilled or id(tag) in self.kept:
+            return
+
+        size = memory.deep_size(tag.value)
+        with self.lock:
+            if self.resident + size <= self.budget:
+                self.resident += size
+                self.kept.add(id(tag))
+                return
+            if self.store is None:
+                self.store = Store(self.directory)
+
+        tag.spill(self.store)
+
+
+# Spiller of the parse executing in the current thread.
+_active = threading.local()
+
+
+@contextlib.contextmanager
+def active(spiller):
+    """Activates a spiller for the current thread; None disables spilling."""
+    previous = getattr(_active, "spiller", None)
+    _active.spiller = spiller
+    try:
+        yield spiller
+    finally:
+        _active.spiller = previous
+
+
+def current():
+    """Retrieves the spiller active in the current thread, if any."""
+    return getattr(_active, "spiller", None)
+
+
+def offer(tag):
+    """Offers a converted tag to the active spiller, if any."""
+    spiller = getattr(_active, "spiller", None)
+    if spiller is not None:
+        spiller.offer(tag)
+
+
+def parsed(tag):
+    """Converts and offers a tag as soon as it has been parsed.
+
+    This only applies if the active spiller, if any, has been given data
+    type definitions. Raw values are otherwise retained until the entire
+    component containing the tag has been parsed, which would limit the
+    memory saved by spilling to the sizes of the other components.
+    """
+    spiller = getattr(_active, "spiller", None)
+    if spiller is not None and spiller.datatypes is not None:
+        tag.convert_value(spiller.datatypes)
+        spiller.offer(tag)
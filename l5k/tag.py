@@ -5,6 +5,8 @@ import functools
 import operator
 import typing
 
+from . import spill
+
 
 def convert_dim(tokens):
     """Converts parsing tokens into an array dimension.
@@ -19,16 +21,77 @@ def convert_dim(tokens):
 
 @dataclasses.dataclass
 class Tag:
-    """Storage for a single, non-alias tag."""
+    """Storage for a single, non-alias tag.
+
+    The value of a tag may be spilled to a spill.Store, after which it is
+    loaded from the store each time it is accessed; modifications to a
+    loaded value are therefore not retained, though assigning a new value
+    replaces the stored value.
+    """
 
     datatype: str
     dim: tuple
     attributes: dict
     value: typing.Any
 
+    # Set once the raw value has been converted.
+    converted: bool = dataclasses.field(
+        default=False,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
     def convert_value(self, datatypes):
-        """Replaces the value with an object representing the data type."""
-        self.value = convert_value(datatypes, self.datatype, self.dim, self.value)
+        """Replaces the value with an object representing the data type.
+
+        The value is only converted once; subsequent calls have no effect.
+        """
+        if not self.converted:
+            self.value = convert_value(
+                datatypes, self.datatype, self.dim, self.value
+            )
+            self.converted = True
+
+    @property
+    def spilled(self):
+        """True if the value has been moved to a spill.Store."""
+        return "_spilled" in self.__dict__
+
+    def spill(self, store):
+        """Moves the value to a spill.Store."""
+        key = store.put(self.value)
+        self.__dict__.pop("_value", None)
+        self.__dict__["_spilled"] = (store, key)
+
+    def __getstate__(self):
+        # Spilled values are included instead of the store, which cannot
+        # be pickled.
+        state = dict(self.__dict__)
+        if state.pop("_spilled", None) is not None:
+            state["_value"] = self.value
+        return state
+
+
+def _get_value(tag):
+    spilled = tag.__dict__.get("_spilled")
+    if spilled is not None:
+        store, key = spilled
+        return store.get(key)
+    try:
+        return tag.__dict__["_value"]
+    except KeyError:
+        raise AttributeError("value") from None
+
+
+def _set_value(tag, value):
+    tag.__dict__.pop("_spilled", None)
+    tag.__dict__["_value"] = value
+
+
+# The value is a property, assigned after the dataclass has been created
+# so the value remains a regular field, e.g., in __init__() and __eq__().
+Tag.value = property(_get_value, _set_value)
 
 
 def convert_tag(tokens):
@@ -54,6 +117,7 @@ def convert_tag(tokens):
         attributes=tokens["attributes"][0],
         value=value,
     )
+    spill.parsed(tag)
 
     return tokens["name"], tag
 
@@ -77,11 +141,13 @@ def convert_value(datatypes, type_name, dim, raw):
     except KeyError:
         return raw
 
-    try:
-        this_type.local_tags
-    except AttributeError:
-        return struct_value(datatypes, this_type, raw)
-    return aoi_value(datatypes, this_type, raw)
+    # Nested values are never converted within an exception handler, as
+    # exceptions raised while handling another are chained to it, and
+    # Python checks the entire chain as each is raised, making conversion
+    # time quadratic in the nesting depth.
+    if hasattr(this_type, "local_tags"):
+        return aoi_value(datatypes, this_type, raw)
+    return struct_value(datatypes, this_type, raw)
 
 
 def struct_value(datatypes, this_type, raw):
@@ -92,16 +158,20 @@ def struct_value(datatypes, this_type, raw):
     """
     struct = {}
 
+    # Raw values are consumed in order by an iterator rather than removed
+    # from the front of the list, which would be quadratic for wide types.
+    raw = iter(raw)
+
     for member_name, member in this_type.members.items():
-        try:
+        if hasattr(member, "target"):
             member_value = (struct[member.target] >> member.bit) & 1
 
-        except AttributeError:
+        else:
             member_value = convert_value(
                 datatypes,
                 member.datatype,
                 member.dim,
-                raw.pop(0),
+                next(raw),
             )
 
         struct[member_name] = member_value
@@ -168,19 +238,19 @@ def array_value(datatypes, this_type, dim, raw):
 def aoi_value(datatypes, aoi, raw):
     """Converts raw tag data into a structured AOI value."""
     value = {}
+    raw = iter(raw)
     for name, member in aoi.value_members.items():
         # Skip packed BOOLs that have already been converted.
         if name in value:
             continue
 
-        next_raw = raw.pop(0)
+        next_raw = next(raw)
 
         # See if this is a packed BOOL member.
-        try:
-            bits = aoi.packed_bools[name]
+        bits = aoi.packed_bools.get(name)
 
         # Convert nonpacked BOOL members.
-        except KeyError:
+        if bits is None:
             value[name] = convert_value(
                 datatypes,
                 member.datatype,
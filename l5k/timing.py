@@ -0,0 +1,192 @@
+"""
+This module implements instrumentation of parsing, reporting the time spent
+in each phase as Event objects passed to the callback given with the
+on_event option.
+
+Measurements are only taken while a callback has been activated in the
+current thread, so instrumented code otherwise only incurs a thread-local
+lookup. Events are reported in the thread that started parsing, including
+events measured by worker threads or processes, which are collected by the
+workers and reported once their results are received.
+"""
+
+import contextlib
+import dataclasses
+import threading
+import time
+
+
+@dataclasses.dataclass
+class Event:
+    """Measurements of a single phase of parsing.
+
+    The phase is one of:
+
+    read: Waiting for content to be decompressed, or reading a stream.
+      Uncompressed files are memory-mapped, and are instead read as they
+      are scanned and decoded.
+
+    scan: Locating the boundaries of top-level components; objects is the
+      number of components located.
+
+    parse: Parsing a single component, identified by component as a
+      (keyword, name) tuple, e.g., ("PROGRAM", "MainProgram"); objects is
+      the number of objects yielded, e.g., the number of controller tags
+      for a TAG component. Sources parsed with the complete grammar are
+      reported as a single ("CONTROLLER", None) component.
+
+    assemble: Constructing the Controller, which includes converting all
+      tag values not yet converted; objects is the number of tags.
+
+    convert: Converting the values of tags of a single data type, identified
+      by component as ("DATATYPE", name); objects is the number of tags.
+
+    Phases may be nested, e.g., convert within assemble. The wall and cpu
+    attributes are the elapsed time and CPU time of the measuring thread,
+    in seconds, and nbytes is the size of the content, if applicable.
+    """
+
+    phase: str
+    component: tuple = None
+    wall: float = 0.0
+    cpu: float = 0.0
+    nbytes: int = 0
+    objects: int = 0
+
+
+class ParseStats:
+    """Accumulates events, for use as the on_event callback.
+
+    For example:
+
+        stats = l5k.ParseStats()
+        l5k.parse(filename, on_event=stats)
+        print(stats.totals()["parse"].wall, stats.slowest(5))
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def __call__(self, event):
+        self.events.append(event)
+
+    def totals(self):
+        """Sums all events by phase.
+
+        Returns a dictionary keyed by phase name, with Event values whose
+        component is None.
+        """
+        totals = {}
+        for event in self.events:
+            total = totals.setdefault(event.phase, Event(event.phase))
+            total.wall += event.wall
+            total.cpu += event.cpu
+            total.nbytes += event.nbytes
+            total.objects += event.objects
+        return totals
+
+    def slowest(self, count=10, phase="parse"):
+        """Lists the events of a phase with the longest elapsed time."""
+        events = [e for e in self.events if e.phase == phase]
+        events.sort(key=lambda e: e.wall, reverse=True)
+        return events[:count]
+
+
+# Callback receiving events measured in the current thread.
+_active = threading.local()
+
+
+@contextlib.contextmanager
+def active(on_event):
+    """Activates a callback for the current thread.
+
+    Measurements are disabled if on_event is None.
+    """
+    previous = getattr(_active, "on_event", None)
+    _active.on_event = on_event
+    try:
+        yield
+    finally:
+        _active.on_event = previous
+
+
+def report(event):
+    """Passes an event measured elsewhere, e.g., by a worker, to the callback."""
+    on_event = getattr(_active, "on_event", None)
+    if on_event is not None:
+        on_event(event)
+
+
+def measure(phase, component=None, nbytes=0):
+    """Measures the enclosed code as a single event.
+
+    Returns a context manager yielding the Event, allowing objects to be
+    assigned; the event is reported if the enclosed code completes without
+    an exception.
+    """
+    event = Event(phase, component, nbytes=nbytes)
+    on_event = getattr(_active, "on_event", None)
+    if on_event is None:
+        return contextlib.nullcontext(event)
+    return _Measurement(event, on_event)
+
+
+class Group:
+    """Accumulates many short measurements into one event per component.
+
+    This avoids reporting an event for each of many small operations, e.g.,
+    converting a single tag's value. Events are reported by report().
+    """
+
+    def __init__(self, phase):
+        self.phase = phase
+        self.events = {}
+
+    def measure(self, component=None, nbytes=0, objects=1):
+        """Measures the enclosed code, adding to the component's event."""
+        if getattr(_active, "on_event", None) is None:
+            return _DISABLED
+        event = self.add(component, nbytes, objects)
+        return _Measurement(event, None)
+
+    def add(self, component=None, nbytes=0, objects=1):
+        """Adds content and objects to the component's event."""
+        try:
+            event = self.events[component]
+        except KeyError:
+            event = self.events[component] = Event(self.phase, component)
+        event.nbytes += nbytes
+        event.objects += objects
+        return event
+
+    def report(self):
+        """Reports the accumulated events to the active callback."""
+        for event in self.events.values():
+            report(event)
+        self.events.clear()
+
+
+# Context manager used in place of a measurement when disabled.
+_DISABLED = contextlib.nullcontext()
+
+
+class _Measurement:
+    """Context manager adding the time of the enclosed code to an event.
+
+    The event is passed to on_event, if given, upon successful completion.
+    """
+
+    def __init__(self, event, on_event):
+        self.event = event
+        self.on_event = on_event
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        return self.event
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.event.wall += time.perf_counter() - self.wall
+        self.event.cpu += time.thread_time() - self.cpu
+        if self.on_event is not None and exc_type is None:
+            self.on_event(self.event)
@@ -1,18 +1,15 @@
 """Common unit test tools."""
 
-from unittest.mock import mock_open, patch
-
 import l5k
 
 
 def parse(data):
     """
-    Wrapper for the parse() function to parse a given string instead
-    of a file.
+    Wrapper for the parse_string() function to add the version statement
+    required for a complete L5K source.
     """
     # Add the mandatory version statement.
     version = "IE_VER := 0;"
     full_content = "\n".join((version, data))
 
-    with patch("builtins.open", mock_open(read_data=full_content)):
-        return l5k.parse(None)
+    return l5k.parse_string(full_content)
@@ -0,0 +1,51 @@
+"""Tests for structured text parsing grammar."""
+
+import unittest
+
+import l5k
+
+
+class Body(unittest.TestCase):
+    """Tests for capturing blocks of structured text lines."""
+
+    def test_single_token(self):
+        """Confirm all lines are captured as a single token."""
+        result = l5k.grammar.st_body.parse_string(
+            """
+            'IF foo THEN
+            ' bar := 1;
+            'END_IF;
+            """
+        )
+        self.assertEqual(1, len(result))
+
+    def test_stops_at_end_keyword(self):
+        """Confirm the block ends at the first line without a quote."""
+        result = l5k.grammar.BODY.parse_string(
+            """
+            BODY
+            'foo := 1;
+            END_BODY
+            """
+        )
+        self.assertEqual("'foo := 1;", result[-1])
+
+    def test_empty_routine(self):
+        """Confirm a routine without any lines is accepted."""
+        l5k.grammar.ST_ROUTINE.parse_string("ST_ROUTINE foo END_ST_ROUTINE")
+
+
+class Lines(unittest.TestCase):
+    """Tests for splitting a structured text block into lines."""
+
+    def test_lines(self):
+        """Confirm lines are split and leading quotes removed."""
+        body = "'IF foo THEN\n    ' bar := 1;\n    'END_IF;"
+        self.assertEqual(
+            ["IF foo THEN", " bar := 1;", "END_IF;"],
+            l5k.grammar.st_lines(body),
+        )
+
+    def test_empty_line(self):
+        """Confirm lines containing only a quote are retained."""
+        self.assertEqual(["foo", "", "bar"], l5k.grammar.st_lines("'foo\n'\n'bar"))
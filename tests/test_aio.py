@@ -0,0 +1,107 @@
+"""Unit tests for the asyncio entry points."""
+
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import cancel
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+TAG
+t : DINT := {};
+END_TAG
+END_CONTROLLER
+"""
+
+
+class Base(unittest.IsolatedAsyncioTestCase):
+    """Base class providing source files."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.tmp = tmp.name
+
+    def write(self, name, content):
+        """Creates a source file."""
+        filename = os.path.join(self.tmp, name)
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        return filename
+
+
+class Aparse(Base):
+    """Tests for parsing a single file."""
+
+    async def test_parse(self):
+        """Confirm a file is parsed."""
+        filename = self.write("a.L5K", SOURCE.format(42))
+        ctl = await l5k.aparse(filename)
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    async def test_options(self):
+        """Confirm parser options are applied."""
+        filename = self.write("a.L5K", SOURCE.format(42))
+        ctl = await l5k.aparse(filename, components=[])
+        self.assertEqual({}, ctl.tags)
+
+    async def test_cancel(self):
+        """Confirm cancellation stops the parse in the executor."""
+        filename = self.write("a.L5K", SOURCE.format(42))
+        started = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        stopped = loop.create_future()
+
+        # Replaces the parse, which runs within the parser's budget, with
+        # one waiting for cancellation, then reaching a checkpoint.
+        def parse_source(parser, data, previous=None):
+            loop.call_soon_threadsafe(started.set)
+            parser.cancel_event.wait(5)
+            try:
+                cancel.checkpoint()
+            except l5k.ParseCancelled as e:
+                loop.call_soon_threadsafe(stopped.set_result, e)
+
+        with patch("l5k.parser.Parser._parse_source", parse_source):
+            task = asyncio.ensure_future(l5k.aparse(filename))
+            await started.wait()
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            self.assertIsInstance(await stopped, l5k.ParseCancelled)
+
+
+class AparseMany(Base):
+    """Tests for parsing several files."""
+
+    async def test_all(self):
+        """Confirm every file is parsed."""
+        filenames = [self.write(f"{i}.L5K", SOURCE.format(i)) for i in range(5)]
+        results = {}
+        async for filename, ctl in l5k.aparse_many(filenames, concurrency=2):
+            results[filename] = ctl.tags["t"].value
+        self.assertEqual({f: i for i, f in enumerate(filenames)}, results)
+
+    async def test_exception(self):
+        """Confirm an exception is raised for a file failing to parse."""
+        filenames = [self.write("bad.L5K", "foo")]
+        with self.assertRaises(Exception):
+            async for _ in l5k.aparse_many(filenames):
+                pass
+
+    async def test_return_exceptions(self):
+        """Confirm exceptions are yielded if requested."""
+        good = self.write("good.L5K", SOURCE.format(1))
+        bad = self.write("bad.L5K", "foo")
+        results = {}
+        async for filename, ctl in l5k.aparse_many(
+            [good, bad], return_exceptions=True
+        ):
+            results[filename] = ctl
+        self.assertEqual(1, results[good].tags["t"].value)
+        self.assertIsInstance(results[bad], Exception)
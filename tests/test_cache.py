@@ -0,0 +1,216 @@
+"""Unit tests for the persistent parse cache."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import __main__ as cli
+from l5k import cache
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+TAG
+t : DINT := {};
+END_TAG
+END_CONTROLLER
+"""
+
+
+class Parse(unittest.TestCase):
+    """Tests for parsing with a cache directory."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = os.path.join(tmp.name, "cache")
+        self.filename = os.path.join(tmp.name, "test.L5K")
+        self.write(1)
+
+    def test_miss(self):
+        """Confirm an uncached file is parsed and stored."""
+        ctl = l5k.parse(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(1, ctl.tags["t"].value)
+        self.assertEqual(1, len(os.listdir(self.cache_dir)))
+
+    def test_hit(self):
+        """Confirm an unchanged file is not parsed again."""
+        first = l5k.parse(self.filename, cache_dir=self.cache_dir)
+        with patch("l5k.parser.Parser._parse_data") as parse_data:
+            second = l5k.parse(self.filename, cache_dir=self.cache_dir)
+        parse_data.assert_not_called()
+        self.assertEqual(first, second)
+
+    def test_changed(self):
+        """Confirm a modified file is parsed again."""
+        l5k.parse(self.filename, cache_dir=self.cache_dir)
+        self.write(2)
+        ctl = l5k.parse(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(2, ctl.tags["t"].value)
+
+    def test_corrupt(self):
+        """Confirm an unreadable entry is replaced."""
+        l5k.parse(self.filename, cache_dir=self.cache_dir)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), "wb"):
+                pass
+        ctl = l5k.parse(self.filename, cache_dir=self.cache_dir)
+        self.assertEqual(1, ctl.tags["t"].value)
+
+    def test_raw_values(self):
+        """Confirm raw and converted values are cached separately."""
+        l5k.parse(self.filename, cache_dir=self.cache_dir)
+        ctl = l5k.parse(self.filename, cache_dir=self.cache_dir, convert_values=False)
+        self.assertFalse(ctl.tags["t"].converted)
+        self.assertEqual(2, len(os.listdir(self.cache_dir)))
+
+    def test_stale_class(self):
+        """Confirm an entry that cannot be unpickled is replaced."""
+        l5k.parse(self.filename, cache_dir=self.cache_dir)
+        with patch("pickle.load", side_effect=AttributeError):
+            self.assertIsNone(cache.load(self.cache_dir, self.entry_key()))
+        self.assertEqual([], os.listdir(self.cache_dir))
+
+    def entry_key(self):
+        """Determines the cache key of the source file."""
+        name = os.listdir(self.cache_dir)[0]
+        return name.removesuffix(cache.SUFFIX)
+
+    def write(self, value):
+        """Writes the source file with a given tag value."""
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(SOURCE.format(value))
+
+
+class Prune(unittest.TestCase):
+    """Tests for removing least-recently used entries."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.cache_dir = tmp.name
+
+        # Create entries with increasing access times.
+        for i, name in enumerate(["old", "mid", "new"]):
+            path = os.path.join(self.cache_dir, name + cache.SUFFIX)
+            with open(path, "wb") as f:
+                f.write(bytes(100))
+            os.utime(path, (i, i))
+
+    def test_oldest_removed(self):
+        """Confirm the least-recently used entries are removed first."""
+        self.assertEqual((2, 200), cache.prune(self.cache_dir, 150))
+        self.assertEqual(["new" + cache.SUFFIX], os.listdir(self.cache_dir))
+
+    def test_within_limit(self):
+        """Confirm nothing is removed if the cache fits."""
+        self.assertEqual((0, 0), cache.prune(self.cache_dir, 300))
+
+    def test_stale_tmp(self):
+        """Confirm abandoned temporary files are removed."""
+        stale = os.path.join(self.cache_dir, "stale" + cache.TMP_SUFFIX)
+        active = os.path.join(self.cache_dir, "active" + cache.TMP_SUFFIX)
+        for path in (stale, active):
+            with open(path, "wb") as f:
+                f.write(bytes(10))
+        os.utime(stale, (0, 0))
+
+        self.assertEqual((1, 10), cache.prune(self.cache_dir, 300))
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(active))
+
+    def test_command(self):
+        """Confirm the prune command line interface."""
+        with contextlib.redirect_stdout(io.StringIO()):
+            cli.main(["cache", "prune", self.cache_dir, "--max-size", "0.15K"])
+        self.assertEqual(["new" + cache.SUFFIX], os.listdir(self.cache_dir))
+
+    def test_removed_concurrently(self):
+        """Confirm entries removed by another process are ignored."""
+        remove = os.remove
+
+        def race(path):
+            remove(path)
+            if path.endswith("old" + cache.SUFFIX):
+                raise FileNotFoundError(path)
+
+        with patch("os.remove", race):
+            self.assertEqual((1, 100), cache.prune(self.cache_dir, 150))
+        self.assertEqual(["new" + cache.SUFFIX], os.listdir(self.cache_dir))
+
+    def test_command_missing_directory(self):
+        """Confirm a missing directory is reported without a traceback."""
+        missing = os.path.join(self.cache_dir, "missing")
+        with self.assertRaises(SystemExit) as cm:
+            cli.main(["cache", "prune", missing, "--max-size", "1K"])
+        self.assertIn(missing, str(cm.exception.code))
+
+
+class InProcess(unittest.TestCase):
+    """Tests for the in-process ParseCache."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = tmp.name
+
+    def test_hit(self):
+        """Confirm an unchanged file returns the cached object."""
+        filename = self.write("a", 1)
+        parse_cache = l5k.ParseCache()
+        first = parse_cache.parse(filename)
+        self.assertIs(first, parse_cache.parse(filename))
+        self.assertEqual((1, 1), (parse_cache.hits, parse_cache.misses))
+
+    def test_modified(self):
+        """Confirm a file with a new modification time is parsed again."""
+        filename = self.write("a", 1)
+        parse_cache = l5k.ParseCache()
+        parse_cache.parse(filename)
+        self.write("a", 2, mtime=1)
+        self.assertEqual(2, parse_cache.parse(filename).tags["t"].value)
+        self.assertEqual((0, 2), (parse_cache.hits, parse_cache.misses))
+        self.assertEqual(1, len(parse_cache))
+
+    def test_maxsize(self):
+        """Confirm the least-recently used entry is evicted."""
+        a = self.write("a", 1)
+        b = self.write("b", 1)
+        c = self.write("c", 1)
+        parse_cache = l5k.ParseCache(maxsize=2)
+        parse_cache.parse(a)
+        parse_cache.parse(b)
+        parse_cache.parse(a)
+        parse_cache.parse(c)
+        self.assertEqual(1, parse_cache.evictions)
+        parse_cache.parse(a)
+        self.assertEqual(2, parse_cache.hits)
+
+    def test_max_bytes(self):
+        """Confirm entries are evicted to remain within the size limit."""
+        a = self.write("a", 1)
+        b = self.write("b", 1)
+        parse_cache = l5k.ParseCache()
+        parse_cache.parse(a)
+        parse_cache.max_bytes = parse_cache.nbytes
+        parse_cache.parse(b)
+        self.assertEqual(1, len(parse_cache))
+        self.assertEqual(1, parse_cache.evictions)
+
+    def test_too_large(self):
+        """Confirm objects larger than the size limit are not cached."""
+        parse_cache = l5k.ParseCache(max_bytes=1)
+        parse_cache.parse(self.write("a", 1))
+        self.assertEqual(0, len(parse_cache))
+
+    def write(self, name, value, mtime=0):
+        """Creates a source file, returning the file name."""
+        filename = os.path.join(self.dir, name + ".L5K")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(SOURCE.format(value))
+        os.utime(filename, (mtime, mtime))
+        return filename
@@ -0,0 +1,126 @@
+"""Unit tests for the memo module."""
+
+import unittest
+
+import pyparsing as pp
+
+import l5k
+from l5k import memo
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+PROGRAM prg
+SFC_ROUTINE sfc
+TRANSITION (ID := 0, X := 120, Y := 1000, Operand := tran)
+CONDITION (LanguageType := ST)
+'TempTag > 0
+END_CONDITION
+END_TRANSITION
+BRANCH (ID := 2, Y := 820, BranchType := Simultaneous, BranchFlow := Diverge)
+LEG (ID := 3)
+END_LEG
+LEG (ID := 4)
+END_LEG
+END_BRANCH
+STOP (ID := 5, X := 120, Y := 1100, Operand := stop)
+END_STOP
+END_SFC_ROUTINE
+END_PROGRAM
+END_CONTROLLER
+"""
+
+
+class MemoElement(unittest.TestCase):
+    """Tests for the Memo expression."""
+
+    def setUp(self):
+        self.calls = 0
+
+        def count(tokens):
+            self.calls += 1
+
+        self.expr = memo.Memo(pp.Word(pp.alphas).add_parse_action(count))
+
+    def test_inactive(self):
+        """Confirm results are not stored without an active cache."""
+        self.expr.parse_string("foo")
+        self.expr.parse_string("foo")
+        self.assertEqual(2, self.calls)
+
+    def test_hit(self):
+        """Confirm a stored result is returned at the same location."""
+        cache = memo.Cache(10)
+        with memo.active(cache):
+            first = self.expr.parse_string("foo")
+            second = self.expr.parse_string("foo")
+        self.assertEqual(1, self.calls)
+        self.assertEqual(first.as_list(), second.as_list())
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_exception(self):
+        """Confirm a stored exception is raised again."""
+        cache = memo.Cache(10)
+        with memo.active(cache):
+            for _ in range(2):
+                with self.assertRaises(pp.ParseException):
+                    self.expr.parse_string("123")
+        self.assertEqual(1, cache.hits)
+
+    def test_bounded(self):
+        """Confirm the oldest entry is discarded when the cache is full."""
+        expr = pp.OneOrMore(self.expr)
+        cache = memo.Cache(2)
+        with memo.active(cache):
+            expr.parse_string("a b c d")
+        self.assertEqual(2, len(cache.entries))
+
+
+class Stats(unittest.TestCase):
+    """Tests for accumulated statistics."""
+
+    def test_disable(self):
+        """Confirm memoization is disabled for a low hit rate."""
+        stats = memo.Stats()
+        cache = memo.Cache(1)
+        cache.misses = memo.SAMPLE_LOOKUPS
+        stats.update(cache)
+        self.assertFalse(stats.enabled)
+
+    def test_remain_enabled(self):
+        """Confirm memoization remains enabled for a sufficient hit rate."""
+        stats = memo.Stats()
+        cache = memo.Cache(1)
+        cache.hits = memo.SAMPLE_LOOKUPS
+        cache.misses = memo.SAMPLE_LOOKUPS
+        stats.update(cache)
+        self.assertTrue(stats.enabled)
+        self.assertEqual(0.5, stats.hit_rate)
+
+
+class ParserMemo(unittest.TestCase):
+    """Tests for parsing with memoization enabled."""
+
+    def test_equal(self):
+        """Confirm the result is identical to parsing without memoization."""
+        ctl = l5k.Parser(memo=1000).parse_string(SOURCE)
+        self.assertEqual(l5k.parse_string(SOURCE), ctl)
+
+    def test_stats(self):
+        """Confirm hits are recorded for nested alternatives."""
+        parser = l5k.Parser(memo=1000)
+        parser.parse_string(SOURCE)
+        self.assertGreater(parser.memo_stats["PROGRAM"].hits, 0)
+
+    def test_module_function(self):
+        """Confirm module-level functions share memoizing expressions."""
+        self.assertEqual(
+            l5k.parse_string(SOURCE), l5k.parse_string(SOURCE, memo=1000)
+        )
+        parser = l5k.parser._parser({"memo": 1000})
+        self.assertIs(l5k.grammar.shared_memo, parser._grammar)
+
+    def test_invalid_size(self):
+        """Confirm an exception is raised for a size less than one."""
+        with self.assertRaises(ValueError):
+            l5k.Parser(memo=0)
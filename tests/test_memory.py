@@ -0,0 +1,113 @@
+"""Unit tests for memory usage estimation."""
+
+import sys
+import unittest
+
+import l5k
+from l5k import memory
+
+
+# Length of an array value.
+BIG = 1000
+
+SOURCE = f"""IE_VER := 2.1;
+CONTROLLER ctl
+DATATYPE udt (FamilyType := NoFamily)
+DINT a;
+END_DATATYPE
+TAG
+big : DINT[{BIG}] := [{",".join(["0"] * BIG)}];
+t : udt := [1];
+END_TAG
+PROGRAM prg
+TAG
+p : DINT := 2;
+END_TAG
+END_PROGRAM
+END_CONTROLLER
+"""
+
+
+class DeepSize(unittest.TestCase):
+    """Tests for the deep_size() function."""
+
+    def test_nested(self):
+        """Confirm referenced objects are included."""
+        item = "x" * 1000
+        self.assertGreater(memory.deep_size([[item]]), sys.getsizeof(item))
+
+    def test_shared(self):
+        """Confirm objects referenced more than once are counted once."""
+        item = "x" * 1000
+        value = [item, item]
+        self.assertEqual(
+            sys.getsizeof(value) + sys.getsizeof(item),
+            memory.deep_size(value),
+        )
+
+    def test_deep(self):
+        """Confirm deeply nested objects do not exceed the recursion limit."""
+        value = []
+        for _ in range(sys.getrecursionlimit() * 2):
+            value = [value]
+        memory.deep_size(value)
+
+
+class Report(unittest.TestCase):
+    """Tests for the Controller memory report."""
+
+    def setUp(self):
+        self.ctl = l5k.parse_string(SOURCE)
+        self.report = self.ctl.memory_report()
+
+    def test_scopes(self):
+        """Confirm the size of each scope is reported."""
+        self.assertGreater(self.report.controller, 0)
+        self.assertEqual({"prg"}, set(self.report.programs))
+        self.assertGreater(self.report.programs["prg"], 0)
+
+    def test_breakdowns(self):
+        """Confirm tag sizes by data type and by category are equal."""
+        self.assertEqual({"DINT", "udt"}, set(self.report.datatypes))
+        self.assertEqual(
+            sum(self.report.datatypes.values()),
+            sum(self.report.categories.values()),
+        )
+
+    def test_values(self):
+        """Confirm values are attributed to the values category."""
+        tags = list(self.ctl.tags.values())
+        tags.extend(self.ctl.programs["prg"].tags.values())
+        values = sum(memory.deep_size(t.value) for t in tags)
+        self.assertGreaterEqual(values, self.report.categories["values"])
+        self.assertGreater(self.report.categories["values"], sys.getsizeof([0] * BIG))
+
+    def test_total(self):
+        """Confirm the total includes the entire controller."""
+        self.assertEqual(memory.deep_size(self.ctl), self.report.total)
+        self.assertGreater(
+            self.report.total,
+            self.report.controller + sum(self.report.programs.values()),
+        )
+
+
+class Spilled(unittest.TestCase):
+    """Tests for the memory report of a Controller with spilled values."""
+
+    def setUp(self):
+        self.ctl = l5k.parse_string(SOURCE, spill_budget=0)
+        self.report = self.ctl.memory_report()
+
+    def test_values(self):
+        """Confirm spilled values are excluded from the values category."""
+        self.assertEqual(0, self.report.categories["values"])
+
+    def test_spilled(self):
+        """Confirm spilled values are reported separately."""
+        self.assertGreater(self.report.spilled, BIG)
+
+    def test_total(self):
+        """Confirm the total excludes spilled values."""
+        report = l5k.parse_string(SOURCE).memory_report()
+        self.assertLess(self.report.total, report.total - BIG)
+        self.assertEqual(0, report.spilled)
@@ -0,0 +1,100 @@
+"""Unit tests for the parallel module."""
+
+import threading
+import unittest
+import warnings
+
+import l5k
+from l5k import cancel, parallel
+from l5k.tag import Tag
+
+
+def tag(value):
+    """Creates a tag with a given raw value."""
+    return Tag("DINT", None, {}, value)
+
+
+class Partition(unittest.TestCase):
+    """Tests for dividing tags among workers."""
+
+    def test_all_tags(self):
+        """Confirm every tag is assigned to exactly one group."""
+        items = [(str(i), tag(list(range(i)))) for i in range(10)]
+        groups = parallel.partition(items, 3)
+        names = sorted(name for g in groups for name, _ in g)
+        self.assertEqual(sorted(str(i) for i in range(10)), names)
+
+    def test_balanced(self):
+        """Confirm a large tag is isolated from smaller tags."""
+        items = [("big", tag(list(range(1000))))]
+        items.extend((str(i), tag(i)) for i in range(4))
+        groups = parallel.partition(items, 2)
+        self.assertIn([items[0]], groups)
+
+    def test_empty_groups(self):
+        """Confirm groups without tags are omitted."""
+        groups = parallel.partition([("t", tag(1))], 4)
+        self.assertEqual(1, len(groups))
+
+
+class Context(unittest.TestCase):
+    """Tests for starting worker processes."""
+
+    def test_not_forked(self):
+        """Confirm worker processes are not forked from the parsing process."""
+        self.assertIn(parallel.context().get_start_method(), ("forkserver", "spawn"))
+
+    def test_threads_running(self):
+        """Confirm processes are started safely while other threads run."""
+        source = """IE_VER := 2.1;
+        CONTROLLER ctl
+        TAG
+        t : DINT := 1;
+        END_TAG
+        PROGRAM prg
+        TAG
+        p : DINT := 2;
+        END_TAG
+        END_PROGRAM
+        END_CONTROLLER
+        """
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            ctl = l5k.parse_string(source, workers=1, pipeline=1)
+        self.assertEqual(2, ctl.programs["prg"].tags["p"].value)
+        self.assertFalse([w for w in caught if "fork()" in str(w.message)])
+
+
+class Abort(unittest.TestCase):
+    """Tests for stopping tasks running in workers."""
+
+    def convert(self, pool_event, budget):
+        """Converts a tag in a pool initialized with a given abort event."""
+        pool = parallel.create_pool(1, {}, "thread", None, object(), pool_event)
+        with pool:
+            future = pool.submit(parallel.convert_tags, [("t", tag(1))], budget)
+            return future.result()
+
+    def test_aborted(self):
+        """Confirm a task without a cancel event observes the abort event."""
+        event = threading.Event()
+        event.set()
+        with self.assertRaises(l5k.ParseCancelled):
+            self.convert(event, cancel.Budget())
+
+    def test_not_aborted(self):
+        """Confirm a clear abort event has no effect."""
+        items, _ = self.convert(threading.Event(), cancel.Budget())
+        self.assertEqual(1, items[0][1].value)
+
+    def test_budget_event(self):
+        """Confirm the cancel event of a task budget takes precedence."""
+        event = threading.Event()
+        event.set()
+        items, _ = self.convert(event, cancel.Budget(threading.Event()))
+        self.assertEqual(1, items[0][1].value)
+
+    def test_abort_event(self):
+        """Confirm an abort event is only created for worker processes."""
+        self.assertIsNone(parallel.abort_event("thread"))
+        self.assertFalse(parallel.abort_event("process").is_set())
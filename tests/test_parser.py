@@ -0,0 +1,661 @@
+"""Unit tests for the parsing entry points."""
+
+import bz2
+import codecs
+import gzip
+import io
+import lzma
+import os
+import pickle
+import tempfile
+import threading
+import time
+import unittest
+import zipfile
+from unittest.mock import patch
+
+import pyparsing as pp
+
+import l5k
+from l5k import cancel
+from l5k.controller import Controller
+from l5k.tag import Tag
+
+from . import common
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+TAG
+t : DINT := 42;
+END_TAG
+END_CONTROLLER
+"""
+
+
+class File(unittest.TestCase):
+    """Tests for parsing the content of a file."""
+
+    def test_bom(self):
+        """Confirm a leading byte order mark is ignored."""
+        data = codecs.BOM_UTF8 + b"""IE_VER := 2.1;
+        CONTROLLER ctl
+        TAG END_TAG
+        END_CONTROLLER
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "test.L5K")
+            with open(filename, "wb") as f:
+                f.write(data)
+            self.assertEqual("ctl", l5k.parse(filename).name)
+
+    def test_non_ascii(self):
+        """Confirm non-ASCII content is decoded."""
+        ctl = common.parse(
+            """
+            CONTROLLER ctl (Description := "Zuführung")
+            TAG END_TAG
+            END_CONTROLLER
+            """
+        )
+        self.assertEqual("Zuführung", ctl.attributes["Description"])
+
+
+class String(unittest.TestCase):
+    """Tests for parsing content from a string."""
+
+    def test_string(self):
+        """Confirm a string is parsed."""
+        self.assertEqual(42, l5k.parse_string(SOURCE).tags["t"].value)
+
+
+class Bytes(unittest.TestCase):
+    """Tests for parsing content from bytes."""
+
+    def test_bytes(self):
+        """Confirm UTF-8 bytes are parsed."""
+        ctl = l5k.parse_bytes(SOURCE.encode("utf-8"))
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_bom(self):
+        """Confirm a leading byte order mark is ignored."""
+        ctl = l5k.parse_bytes(codecs.BOM_UTF8 + SOURCE.encode("utf-8"))
+        self.assertEqual("ctl", ctl.name)
+
+    def test_bytearray(self):
+        """Confirm a bytearray is accepted."""
+        ctl = l5k.parse_bytes(bytearray(SOURCE.encode("utf-8")))
+        self.assertEqual("ctl", ctl.name)
+
+
+class Stream(unittest.TestCase):
+    """Tests for parsing content read from a file object."""
+
+    def test_text(self):
+        """Confirm a text stream is parsed."""
+        ctl = l5k.parse_stream(io.StringIO(SOURCE))
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_binary(self):
+        """Confirm a binary stream is parsed."""
+        ctl = l5k.parse_stream(io.BytesIO(SOURCE.encode("utf-8")))
+        self.assertEqual(42, ctl.tags["t"].value)
+
+
+class ParserObject(unittest.TestCase):
+    """Tests for the Parser class."""
+
+    SOURCE = """IE_VER := 2.1;
+    CONTROLLER ctl
+    DATATYPE udt
+    DINT a;
+    END_DATATYPE
+    TAG
+    t : udt := [1];
+    END_TAG
+    PROGRAM prg
+    END_PROGRAM
+    END_CONTROLLER
+    """
+
+    def test_reuse(self):
+        """Confirm an instance can parse several sources."""
+        parser = l5k.Parser()
+        self.assertEqual(42, parser.parse_string(SOURCE).tags["t"].value)
+        self.assertEqual({"a": 1}, parser.parse_string(self.SOURCE).tags["t"].value)
+
+    def test_independent_grammar(self):
+        """Confirm instances do not share grammar expressions."""
+        a = l5k.Parser()
+        b = l5k.Parser()
+        self.assertIsNot(a._grammar.TAG, b._grammar.TAG)
+
+    def test_components(self):
+        """Confirm only selected components are included."""
+        ctl = l5k.Parser(components=["TAG"]).parse_string(self.SOURCE)
+        self.assertEqual({"a": 1}, ctl.tags["t"].value)
+        self.assertEqual({}, ctl.programs)
+        self.assertIn("udt", ctl.datatypes)
+
+    def test_components_fallback(self):
+        """Confirm components are excluded when parsed with the complete grammar."""
+        source = self.SOURCE.replace(
+            "t : udt := [1];\n    END_TAG",
+            "t : udt := [1]; s : STRING := 'x'; END_TAG",
+        )
+        ctl = l5k.Parser(components=["TAG"]).parse_string(source)
+        self.assertEqual({"a": 1}, ctl.tags["t"].value)
+        self.assertEqual({}, ctl.programs)
+
+    def test_unknown_component(self):
+        """Confirm an exception is raised for an unknown component."""
+        with self.assertRaises(ValueError):
+            l5k.Parser(components=["MODULE"])
+
+
+class Cancel(unittest.TestCase):
+    """Tests for cancelling a parse."""
+
+    def test_cancelled(self):
+        """Confirm a set cancel event aborts parsing."""
+        event = threading.Event()
+        event.set()
+        with self.assertRaises(l5k.ParseCancelled):
+            l5k.parse_string(SOURCE, cancel_event=event)
+
+    def test_not_cancelled(self):
+        """Confirm a clear cancel event has no effect."""
+        ctl = l5k.parse_string(SOURCE, cancel_event=threading.Event())
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_deadline(self):
+        """Confirm an expired deadline aborts parsing."""
+        with self.assertRaises(l5k.ParseTimeout) as cm:
+            l5k.parse_string(SOURCE, deadline=time.monotonic() - 1)
+        self.assertEqual(SOURCE.index("TAG"), cm.exception.offset)
+        self.assertEqual(("TAG", None), cm.exception.component)
+
+    def test_future_deadline(self):
+        """Confirm a deadline that has not passed has no effect."""
+        ctl = l5k.parse_string(SOURCE, deadline=time.monotonic() + 60)
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_grammar(self):
+        """Confirm the budget is checked within a component."""
+        with cancel.active(cancel.Budget(deadline=0)):
+            with self.assertRaises(l5k.ParseTimeout):
+                l5k.grammar.TAG.parse_string("TAG t : DINT := 1; END_TAG")
+
+    def test_conversion(self):
+        """Confirm the budget is checked while converting tag values."""
+        tags = {"t": Tag("DINT", None, {}, 1)}
+        with cancel.active(cancel.Budget(deadline=0)):
+            with self.assertRaises(l5k.ParseTimeout):
+                Controller("ctl", {}, {}, {}, tags, {})
+
+    def test_pickle(self):
+        """Confirm the location is retained when pickled."""
+        e = pickle.loads(pickle.dumps(l5k.ParseTimeout("x", 5, ("TAG", None))))
+        self.assertEqual((5, ("TAG", None)), (e.offset, e.component))
+        self.assertIsInstance(e, l5k.ParseTimeout)
+
+    def test_worker_deadline(self):
+        """Confirm a deadline aborts parsing promptly with worker threads."""
+
+        # Task running until its budget is exhausted.
+        def parse_program(text, budget, record):
+            with cancel.active(budget):
+                while True:
+                    cancel.checkpoint()
+                    time.sleep(0.01)
+
+        source = SOURCE.replace(
+            "END_CONTROLLER", "PROGRAM prg END_PROGRAM END_CONTROLLER"
+        )
+        start = time.monotonic()
+        with patch("l5k.parallel.parse_program", parse_program):
+            with self.assertRaises(l5k.ParseTimeout) as cm:
+                l5k.parse_string(
+                    source,
+                    workers=2,
+                    executor="thread",
+                    deadline=start + 0.2,
+                )
+        self.assertLess(time.monotonic() - start, 2)
+        self.assertEqual(("PROGRAM", "prg"), cm.exception.component)
+
+
+class Feed(unittest.TestCase):
+    """Tests for the incremental feed parser."""
+
+    SOURCE = """IE_VER := 2.1;
+    CONTROLLER ctl
+    DATATYPE udt
+    DINT a;
+    END_DATATYPE
+    TAG
+    t : udt := [1];
+    END_TAG
+    PROGRAM prg
+    TAG
+    x : udt := [2];
+    END_TAG
+    END_PROGRAM
+    END_CONTROLLER
+    """
+
+    def setUp(self):
+        self.emitted = []
+
+    def callback(self, attr, name, obj):
+        """Records objects passed to the callback."""
+        self.emitted.append((attr, name, obj))
+
+    def test_controller(self):
+        """Confirm the result is identical to parsing a complete source."""
+        feed_parser = l5k.FeedParser()
+        feed_parser.feed(self.SOURCE.encode())
+        self.assertEqual(l5k.parse_string(self.SOURCE), feed_parser.close())
+
+    def test_small_chunks(self):
+        """Confirm content split into single bytes is parsed."""
+        feed_parser = l5k.FeedParser(self.callback)
+        for b in self.SOURCE.encode():
+            feed_parser.feed(bytes([b]))
+        ctl = feed_parser.close()
+        self.assertEqual({"a": 2}, ctl.programs["prg"].tags["x"].value)
+        self.assertEqual(
+            [("datatypes", "udt"), ("tags", "t"), ("programs", "prg")],
+            [(attr, name) for attr, name, _ in self.emitted],
+        )
+
+    def test_before_end(self):
+        """Confirm components are emitted before the remaining content."""
+        feed_parser = l5k.FeedParser(self.callback)
+        data = self.SOURCE.encode()
+        feed_parser.feed(data[: data.index(b"PROGRAM")])
+        self.assertEqual(
+            [("datatypes", "udt"), ("tags", "t")],
+            [(attr, name) for attr, name, _ in self.emitted],
+        )
+
+    def test_converted(self):
+        """Confirm tag values are converted before being emitted."""
+        feed_parser = l5k.FeedParser(self.callback)
+        feed_parser.feed(self.SOURCE.encode())
+        _, _, tag = self.emitted[1]
+        self.assertEqual({"a": 1}, tag.value)
+
+    def test_fallback(self):
+        """Confirm remaining objects are emitted by the complete grammar."""
+        source = self.SOURCE.replace(
+            "t : udt := [1];\n    END_TAG",
+            "t : udt := [1]; s : STRING := 'x'; END_TAG",
+        )
+        feed_parser = l5k.FeedParser(self.callback)
+        feed_parser.feed(source.encode())
+        ctl = feed_parser.close()
+        self.assertEqual("x", ctl.tags["s"].value)
+        self.assertEqual(
+            ["udt", "t", "s", "prg"],
+            [name for _, name, _ in self.emitted],
+        )
+
+
+class Compressed(unittest.TestCase):
+    """Tests for compressed content."""
+
+    def test_gzip_file(self):
+        """Confirm a gzip-compressed file is parsed."""
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "test.L5K.gz")
+            with gzip.open(filename, "wt", encoding="utf-8") as f:
+                f.write(SOURCE)
+            self.assertEqual(42, l5k.parse(filename).tags["t"].value)
+
+    def test_xz(self):
+        """Confirm xz-compressed content is parsed."""
+        ctl = l5k.parse_bytes(lzma.compress(SOURCE.encode("utf-8")))
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_bz2(self):
+        """Confirm bzip2-compressed content is parsed."""
+        ctl = l5k.parse_bytes(bz2.compress(SOURCE.encode("utf-8")))
+        self.assertEqual(42, ctl.tags["t"].value)
+
+    def test_zip(self):
+        """Confirm the L5K file within a zip archive is parsed."""
+        data = self.zip({"readme.txt": "foo", "ctl.L5K": SOURCE})
+        self.assertEqual(42, l5k.parse_bytes(data).tags["t"].value)
+
+    def test_zip_ambiguous(self):
+        """Confirm an exception is raised for several L5K files in a zip."""
+        data = self.zip({"a.L5K": SOURCE, "b.L5K": SOURCE})
+        with self.assertRaises(ValueError):
+            l5k.parse_bytes(data)
+
+    def test_small_chunks(self):
+        """Confirm components split across many chunks are parsed."""
+        data = gzip.compress(
+            b"""IE_VER := 2.1;
+            CONTROLLER ctl (foo := "bar")
+            DATATYPE udt
+            DINT a;
+            END_DATATYPE
+            TAG
+            t : udt := [42];
+            END_TAG
+            PROGRAM prg
+            END_PROGRAM
+            END_CONTROLLER
+            """
+        )
+        with patch("l5k.source.CHUNK_SIZE", 3):
+            ctl = l5k.parse_bytes(data)
+        self.assertEqual({"a": 42}, ctl.tags["t"].value)
+        self.assertEqual({"foo": "bar"}, ctl.attributes)
+        self.assertIn("prg", ctl.programs)
+
+    def zip(self, files):
+        """Creates a zip archive containing a set of files."""
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as archive:
+            for name, content in files.items():
+                archive.writestr(name, content)
+        return buf.getvalue()
+
+
+class SkippedComponents(unittest.TestCase):
+    """Tests for components that are not stored."""
+
+    def test_module(self):
+        """Confirm modules are skipped."""
+        ctl = common.parse(
+            """
+            CONTROLLER ctl
+            MODULE Local (Parent := "Local")
+            END_MODULE
+            TAG
+            t : DINT := 1;
+            END_TAG
+            END_CONTROLLER
+            """
+        )
+        self.assertEqual(1, ctl.tags["t"].value)
+
+
+class Fallback(unittest.TestCase):
+    """Tests for sources parsed with the complete grammar."""
+
+    def test_same_line_string(self):
+        """Confirm a component ending on a line with a string is parsed."""
+        ctl = common.parse(
+            """
+            CONTROLLER ctl
+            TAG t : STRING := 'x'; END_TAG
+            END_CONTROLLER
+            """
+        )
+        self.assertEqual("x", ctl.tags["t"].value)
+
+
+class Parallel(unittest.TestCase):
+    """Tests for parsing programs in worker processes."""
+
+    EXECUTOR = "process"
+
+    SOURCE = """IE_VER := 2.1;
+    CONTROLLER ctl
+    DATATYPE udt
+    DINT a;
+    END_DATATYPE
+    TAG
+    t : udt := [1];
+    END_TAG
+    PROGRAM prg1
+    TAG
+    x : udt := [2];
+    END_TAG
+    END_PROGRAM
+    PROGRAM prg2
+    END_PROGRAM
+    PROGRAM prg3
+    TAG
+    y : DINT := 3;
+    END_TAG
+    END_PROGRAM
+    END_CONTROLLER
+    """
+
+    def test_equal(self):
+        """Confirm the result is identical to parsing in a single process."""
+        ctl = self.parse(self.SOURCE)
+        self.assertEqual(l5k.parse_string(self.SOURCE), ctl)
+
+    def test_order(self):
+        """Confirm programs retain their original order."""
+        ctl = self.parse(self.SOURCE)
+        self.assertEqual(["prg1", "prg2", "prg3"], list(ctl.programs))
+
+    def test_converted(self):
+        """Confirm program tag values are converted by the workers."""
+        ctl = self.parse(self.SOURCE)
+        self.assertEqual({"a": 2}, ctl.programs["prg1"].tags["x"].value)
+
+    def test_controller_tags(self):
+        """Confirm controller tag values are converted by the workers."""
+        source = self.SOURCE.replace(
+            "t : udt := [1];",
+            "t : udt := [1];\n    u : DINT := 4;\n    v : udt[2] := [[5],[6]];",
+        )
+        ctl = self.parse(source)
+        self.assertEqual(["t", "u", "v"], list(ctl.tags))
+        self.assertEqual({"a": 1}, ctl.tags["t"].value)
+        self.assertEqual(4, ctl.tags["u"].value)
+        self.assertEqual([{"a": 5}, {"a": 6}], ctl.tags["v"].value)
+
+    def test_invalid(self):
+        """Confirm a program failing to parse raises a parse exception."""
+        source = self.SOURCE.replace("y : DINT := 3;", "y : DINT := 3")
+        with self.assertRaises(pp.ParseBaseException):
+            self.parse(source)
+
+    def parse(self, content):
+        """Parses a source with two workers."""
+        return l5k.parse_string(content, workers=2, executor=self.EXECUTOR)
+
+
+class Threads(Parallel):
+    """Tests for parsing programs in worker threads."""
+
+    EXECUTOR = "thread"
+
+    def test_unknown_executor(self):
+        """Confirm an exception is raised for an unknown executor."""
+        with self.assertRaises(ValueError):
+            l5k.parse_string(self.SOURCE, workers=2, executor="foo")
+
+    def test_shared_grammar(self):
+        """Confirm worker threads use the parser's grammar expressions."""
+        used = []
+
+        def parse_program(text, budget, record):
+            used.append(l5k.parallel._worker.grammar)
+            return [], []
+
+        parser = l5k.Parser(workers=2, executor="thread")
+        with patch("l5k.parallel.parse_program", parse_program):
+            parser.parse_string(self.SOURCE)
+        self.assertTrue(used)
+        for g in used:
+            self.assertIs(parser._grammar, g)
+
+
+class RawValues(unittest.TestCase):
+    """Tests for parsing without converting tag values."""
+
+    SOURCE = Parallel.SOURCE
+
+    def test_raw(self):
+        """Confirm tag values remain raw in all scopes."""
+        ctl = self.parse()
+        self.assertEqual([1], ctl.tags["t"].value)
+        self.assertEqual([2], ctl.programs["prg1"].tags["x"].value)
+        self.assertFalse(ctl.tags["t"].converted)
+
+    def test_convert_all(self):
+        """Confirm all values can be converted afterwards."""
+        ctl = self.parse()
+        self.assertEqual(3, ctl.convert_values())
+        self.assertEqual(l5k.parse_string(self.SOURCE), ctl)
+
+    def test_predicate(self):
+        """Confirm only values of selected tags are converted."""
+        ctl = self.parse()
+        count = ctl.convert_values(lambda scope, name, tag: scope == "prg1")
+        self.assertEqual(1, count)
+        self.assertEqual({"a": 2}, ctl.programs["prg1"].tags["x"].value)
+        self.assertEqual([1], ctl.tags["t"].value)
+
+    def test_single_tag(self):
+        """Confirm a single tag can be converted."""
+        ctl = self.parse()
+        ctl.tags["t"].convert_value(ctl.datatype_table())
+        self.assertEqual({"a": 1}, ctl.tags["t"].value)
+
+    def test_workers(self):
+        """Confirm values remain raw when parsed by workers."""
+        ctl = self.parse(workers=2, executor="thread")
+        self.assertEqual([1], ctl.tags["t"].value)
+        self.assertEqual([2], ctl.programs["prg1"].tags["x"].value)
+
+    def test_pipeline(self):
+        """Confirm values remain raw if conversion is pipelined."""
+        ctl = self.parse(pipeline=1)
+        self.assertEqual([2], ctl.programs["prg1"].tags["x"].value)
+
+    def test_complete_grammar(self):
+        """Confirm values remain raw when parsed with the complete grammar."""
+        with patch("l5k.scan.components", side_effect=l5k.scan.ScanError):
+            ctl = self.parse()
+        self.assertEqual([1], ctl.tags["t"].value)
+
+    def test_callback(self):
+        """Confirm a FeedParser callback receives raw values."""
+        received = {}
+        parser = l5k.FeedParser(
+            lambda attr, name, obj: received.setdefault(name, obj),
+            convert_values=False,
+        )
+        parser.feed(self.SOURCE.encode())
+        parser.close()
+        self.assertEqual([1], received["t"].value)
+
+    def test_converted_default(self):
+        """Confirm Controllers are converted outside of a raw parse."""
+        self.parse()
+        self.assertEqual({"a": 1}, l5k.parse_string(self.SOURCE).tags["t"].value)
+
+    def parse(self, **options):
+        """Parses the source without converting values."""
+        return l5k.parse_string(self.SOURCE, convert_values=False, **options)
+
+
+class Reparse(unittest.TestCase):
+    """Tests for parsing a revised source."""
+
+    ORIGINAL = """IE_VER := 2.1;
+    CONTROLLER ctl
+    DATATYPE udt
+    DINT a;
+    END_DATATYPE
+    DATATYPE other
+    DINT b;
+    END_DATATYPE
+    TAG
+    t : udt := [1];
+    END_TAG
+    PROGRAM prg1
+    TAG
+    x : DINT := 1;
+    END_TAG
+    END_PROGRAM
+    PROGRAM prg2
+    TAG
+    y : other := [2];
+    END_TAG
+    END_PROGRAM
+    END_CONTROLLER
+    """
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.filename = os.path.join(tmp.name, "test.L5K")
+        self.previous = self.parse(self.ORIGINAL)
+
+    def test_unchanged(self):
+        """Confirm all objects are reused from an unchanged source."""
+        ctl = self.reparse(self.ORIGINAL)
+        self.assertEqual(self.previous, ctl)
+        self.assertIs(self.previous.datatypes["udt"], ctl.datatypes["udt"])
+        self.assertIs(self.previous.tags["t"], ctl.tags["t"])
+        self.assertIs(self.previous.programs["prg1"], ctl.programs["prg1"])
+
+    def test_modified_program(self):
+        """Confirm only a modified program is parsed again."""
+        ctl = self.reparse(self.ORIGINAL.replace("x : DINT := 1", "x : DINT := 3"))
+        self.assertEqual(3, ctl.programs["prg1"].tags["x"].value)
+        self.assertIs(self.previous.programs["prg2"], ctl.programs["prg2"])
+        self.assertIs(self.previous.tags["t"], ctl.tags["t"])
+
+    def test_added_program(self):
+        """Confirm a new program is parsed."""
+        ctl = self.reparse(
+            self.ORIGINAL.replace(
+                "END_CONTROLLER",
+                "PROGRAM prg3 END_PROGRAM END_CONTROLLER",
+            )
+        )
+        self.assertEqual(["prg1", "prg2", "prg3"], list(ctl.programs))
+
+    def test_modified_datatype(self):
+        """Confirm tags of a modified data type are converted again."""
+        ctl = self.reparse(
+            self.ORIGINAL.replace("DINT a;", "DINT a;\n    DINT c;").replace(
+                "t : udt := [1]", "t : udt := [1,5]"
+            )
+        )
+        self.assertEqual({"a": 1, "c": 5}, ctl.tags["t"].value)
+        self.assertIs(self.previous.datatypes["other"], ctl.datatypes["other"])
+        self.assertIs(self.previous.programs["prg2"], ctl.programs["prg2"])
+
+    def test_nested_datatype(self):
+        """Confirm tags of a type containing a modified type are parsed again."""
+        original = self.ORIGINAL.replace("DINT b;", "udt b;").replace(
+            "y : other := [2]", "y : other := [[2]]"
+        )
+        self.previous = self.parse(original)
+        ctl = self.reparse(original.replace("DINT a;", "REAL a;"))
+        self.assertIsNot(self.previous.programs["prg2"], ctl.programs["prg2"])
+        self.assertIs(self.previous.programs["prg1"], ctl.programs["prg1"])
+
+    def test_removed_datatype(self):
+        """Confirm tags of a removed data type are parsed again."""
+        ctl = self.reparse(
+            self.ORIGINAL.replace("DATATYPE other\n    DINT b;\n    END_DATATYPE", "")
+        )
+        self.assertNotIn("other", ctl.datatypes)
+        self.assertEqual([2], ctl.programs["prg2"].tags["y"].value)
+
+    def parse(self, content):
+        """Parses a source via a file."""
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        return l5k.parse(self.filename)
+
+    def reparse(self, content):
+        """Reparses a revised source via a file."""
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(content)
+        return l5k.reparse(self.previous, self.filename)
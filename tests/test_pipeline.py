@@ -0,0 +1,117 @@
+"""Unit tests for the pipeline module."""
+
+import threading
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import (
+    cancel,
+    pipeline,
+    tag,
+)
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+DATATYPE udt
+DINT a;
+END_DATATYPE
+TAG
+t1 : udt := [1];
+t2 : DINT[2] := [2,3];
+END_TAG
+PROGRAM prg
+TAG
+p : udt := [4];
+END_TAG
+END_PROGRAM
+END_CONTROLLER
+"""
+
+
+class Parse(unittest.TestCase):
+    """Tests for parsing with pipelined conversion."""
+
+    def test_equal(self):
+        """Confirm the result is identical to sequential conversion."""
+        self.assertEqual(
+            l5k.parse_string(SOURCE),
+            l5k.parse_string(SOURCE, pipeline=1),
+        )
+
+    def test_converting_thread(self):
+        """Confirm values are converted outside the parsing thread."""
+        threads = set()
+        convert = tag.Tag.convert_value
+
+        def record(self, datatypes):
+            threads.add(threading.current_thread())
+            convert(self, datatypes)
+
+        with patch("l5k.tag.Tag.convert_value", record):
+            ctl = l5k.parse_string(SOURCE, pipeline=1)
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual({"a": 4}, ctl.programs["prg"].tags["p"].value)
+
+    def test_error(self):
+        """Confirm an exception raised while converting is propagated."""
+        with patch("l5k.tag.Tag.convert_value", side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                l5k.parse_string(SOURCE, pipeline=1)
+
+    def test_events(self):
+        """Confirm conversion events are reported."""
+        events = []
+        l5k.parse_string(SOURCE, pipeline=1, on_event=events.append)
+        converted = sum(e.objects for e in events if e.phase == "convert")
+        self.assertEqual(3, converted)
+
+    def test_callback(self):
+        """Confirm a FeedParser callback receives converted values."""
+        received = {}
+        parser = l5k.FeedParser(
+            lambda attr, name, obj: received.setdefault(name, obj),
+            pipeline=1,
+        )
+        parser.feed(SOURCE.encode())
+        parser.close()
+        self.assertEqual({"a": 1}, received["t1"].value)
+
+    def test_invalid(self):
+        """Confirm an exception is raised for a size less than one."""
+        with self.assertRaises(ValueError):
+            l5k.Parser(pipeline=0)
+
+
+class Converter(unittest.TestCase):
+    """Tests for the Converter class."""
+
+    def test_cancelled(self):
+        """Confirm conversion observes the given budget."""
+        event = threading.Event()
+        event.set()
+        converter = pipeline.Converter({}, 1)
+        converter.put([tag.Tag("DINT", None, {}, 1)], cancel.Budget(event))
+        with self.assertRaises(l5k.ParseCancelled):
+            converter.finish()
+
+    def test_close(self):
+        """Confirm queued tags are discarded when closed."""
+        converted = []
+        release = threading.Event()
+
+        def convert(tags, datatypes, group):
+            release.wait()
+            converted.append(tags)
+
+        with patch("l5k.controller.convert_tags", convert):
+            converter = pipeline.Converter({}, 2)
+            converter.put("first", cancel.Budget())
+            converter.put("second", cancel.Budget())
+
+            # Conversion of the first group resumes after closing begins.
+            threading.Timer(0.1, release.set).start()
+            converter.close()
+
+        self.assertEqual(["first"], converted)
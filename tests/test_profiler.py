@@ -0,0 +1,85 @@
+"""Unit tests for the profiler module."""
+
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import pyparsing as pp
+
+import l5k
+from l5k import __main__ as cli
+from l5k import profiler
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl (ProcessorType := "1756-L83E")
+DATATYPE udt (FamilyType := NoFamily)
+DINT a;
+END_DATATYPE
+MODULE Local (Parent := "Local")
+END_MODULE
+TAG
+t : udt := [42];
+END_TAG
+PROGRAM prg
+ROUTINE main
+N: XIC(t.a)OTE(t.a);
+END_ROUTINE
+END_PROGRAM
+END_CONTROLLER
+"""
+
+
+class Profile(unittest.TestCase):
+    """Tests for profiling grammar expressions."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.filename = os.path.join(tmp.name, "test.L5K")
+        with open(self.filename, "w", encoding="utf-8") as f:
+            f.write(SOURCE)
+
+    def test_counts(self):
+        """Confirm attempts are counted for named expressions."""
+        stats = {s.name: s for s in profiler.profile(self.filename)}
+        self.assertGreater(stats["rung"].matches, 0)
+        for s in stats.values():
+            self.assertEqual(s.calls, s.matches + s.failures)
+
+    def test_copies(self):
+        """Confirm copies given a results name are recorded."""
+        stats = {s.name: s for s in profiler.profile(self.filename)}
+        self.assertGreater(stats["attribute_list"].calls, 0)
+
+    def test_times(self):
+        """Confirm nested time is excluded from own time."""
+        for s in profiler.profile(self.filename):
+            self.assertLessEqual(s.own_time, s.time)
+
+    def test_skipped(self):
+        """Confirm skipped components are only profiled if requested."""
+        names = [s.name for s in profiler.profile(self.filename)]
+        self.assertNotIn("MODULE", names)
+        names = [s.name for s in profiler.profile(self.filename, complete=True)]
+        self.assertIn("MODULE", names)
+
+    def test_result(self):
+        """Confirm the profiled parse yields the same result."""
+        ctl = profiler.Profiler().parse(self.filename)
+        self.assertEqual(l5k.parse(self.filename), ctl)
+
+    def test_shared_unmodified(self):
+        """Confirm expressions defined by pyparsing are not modified."""
+        profiler.Profiler()
+        self.assertFalse(pp.common.signed_integer.debug)
+        self.assertFalse(l5k.grammar.rung.debug)
+
+    def test_command(self):
+        """Confirm the profile command line interface."""
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            cli.main(["profile", self.filename, "--limit", "3"])
+        self.assertEqual(4, len(out.getvalue().splitlines()))
@@ -0,0 +1,119 @@
+"""Unit tests for the progress module."""
+
+import gzip
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import progress
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+TAG
+{}
+END_TAG
+PROGRAM prg
+END_PROGRAM
+END_CONTROLLER
+""".format("\n".join(f"t{i} : DINT := {i};" for i in range(100)))
+
+
+def collect(parse, *args, **options):
+    """Parses content, returning all progress reports."""
+    reports = []
+    parse(*args, on_progress=reports.append, progress_interval=0, **options)
+    return reports
+
+
+class Parse(unittest.TestCase):
+    """Tests for progress reported while parsing."""
+
+    def test_complete(self):
+        """Confirm completion is reported with the total size."""
+        reports = collect(l5k.parse_string, SOURCE)
+        total = len(SOURCE)
+        self.assertEqual(progress.Progress(total, total), reports[-1])
+        self.assertEqual(1.0, reports[-1].fraction)
+
+    def test_increasing(self):
+        """Confirm offsets do not decrease."""
+        offsets = [r.offset for r in collect(l5k.parse_string, SOURCE)]
+        self.assertEqual(sorted(offsets), offsets)
+
+    def test_components(self):
+        """Confirm the component being parsed is reported."""
+        components = {r.component for r in collect(l5k.parse_string, SOURCE)}
+        self.assertIn(("TAG", None), components)
+        self.assertIn(("PROGRAM", "prg"), components)
+
+    def test_within_component(self):
+        """Confirm progress is reported within a component."""
+        start = SOURCE.index("TAG")
+        end = SOURCE.index("END_TAG")
+        offsets = {
+            r.offset
+            for r in collect(l5k.parse_string, SOURCE)
+            if r.component == ("TAG", None)
+        }
+        self.assertGreater(len([o for o in offsets if start < o < end]), 50)
+
+    def test_complete_grammar(self):
+        """Confirm progress is reported when parsed with the complete grammar."""
+        with patch("l5k.scan.components", side_effect=l5k.scan.ScanError):
+            reports = collect(l5k.parse_string, SOURCE)
+        self.assertIn(("CONTROLLER", None), {r.component for r in reports})
+        self.assertEqual(len(SOURCE), reports[-1].offset)
+
+    def test_compressed(self):
+        """Confirm the total is only reported upon completion if compressed."""
+        reports = collect(l5k.parse_bytes, gzip.compress(SOURCE.encode()))
+        self.assertEqual({None}, {r.total for r in reports[:-1]})
+        self.assertEqual(len(SOURCE), reports[-1].total)
+
+    def test_feed(self):
+        """Confirm progress is reported for incrementally supplied content."""
+        reports = []
+        parser = l5k.FeedParser(on_progress=reports.append, progress_interval=0)
+        parser.feed(SOURCE.encode())
+        self.assertIsNone(reports[-1].total)
+        parser.close()
+        self.assertEqual(progress.Progress(len(SOURCE), len(SOURCE)), reports[-1])
+
+    def test_disabled(self):
+        """Confirm no reporter is created without a callback."""
+        with patch("l5k.progress.Reporter") as reporter:
+            l5k.parse_string(SOURCE)
+        reporter.assert_not_called()
+
+
+class Reporter(unittest.TestCase):
+    """Tests for throttling progress reports."""
+
+    def setUp(self):
+        self.reports = []
+        self.now = 0.0
+        patcher = patch("time.monotonic", lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.reporter = progress.Reporter(self.reports.append, 100, 1.0)
+
+    def test_throttled(self):
+        """Confirm reports are limited to one per interval."""
+        for offset in range(10):
+            self.reporter.update(offset)
+        self.assertEqual([], self.reports)
+
+        self.now = 1.0
+        self.reporter.enter(20, ("TAG", None))
+        self.reporter.update(30)
+        self.assertEqual([progress.Progress(20, 100, ("TAG", None))], self.reports)
+
+    def test_finish(self):
+        """Confirm completion is reported regardless of the interval."""
+        self.reporter.finish()
+        self.assertEqual([progress.Progress(100, 100)], self.reports)
+
+    def test_unknown_total(self):
+        """Confirm the fraction is undefined without a total."""
+        self.assertIsNone(progress.Progress(10).fraction)
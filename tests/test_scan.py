@@ -0,0 +1,99 @@
+"""Unit tests for locating top-level components."""
+
+import unittest
+
+from l5k import scan
+
+
+def spans(data):
+    """Scans a complete source, returning the list of component spans."""
+    return list(scan.components(data, scan.head(data)))
+
+
+class Head(unittest.TestCase):
+    """Tests for locating the end of the controller definition."""
+
+    def test_header(self):
+        """Confirm the header comment and version statement are skipped."""
+        data = b"(*****\n foo *)\nIE_VER := 2.1;\nCONTROLLER ctl\nTAG"
+        self.assertEqual(data.index(b"\nTAG"), scan.head(data))
+
+    def test_attributes(self):
+        """Confirm the controller attribute list is included."""
+        data = b'IE_VER := 2.1; CONTROLLER ctl (foo := "bar)") TAG'
+        self.assertEqual(data.index(b" TAG"), scan.head(data))
+
+    def test_missing(self):
+        """Confirm an exception is raised if no controller is present."""
+        with self.assertRaises(scan.ScanError):
+            scan.head(b"IE_VER := 2.1; PROGRAM")
+
+
+class Components(unittest.TestCase):
+    """Tests for locating components within the controller."""
+
+    def test_offsets(self):
+        """Confirm spans cover the starting and ending keywords."""
+        data = b"IE_VER := 2.1; CONTROLLER ctl TAG END_TAG END_CONTROLLER"
+        span = spans(data)[0]
+        self.assertEqual(b"TAG END_TAG", data[span.start : span.end])
+
+    def test_keyword(self):
+        """Confirm the component keyword is reported."""
+        data = b"IE_VER := 2.1; CONTROLLER ctl TAG END_TAG END_CONTROLLER"
+        self.assertEqual(["TAG"], [s.keyword for s in spans(data)])
+
+    def test_name(self):
+        """Confirm names of named components are reported."""
+        data = b"""IE_VER := 2.1; CONTROLLER ctl
+        DATATYPE udt DINT a; END_DATATYPE
+        TAG END_TAG
+        PROGRAM prg END_PROGRAM
+        END_CONTROLLER"""
+        self.assertEqual(["udt", None, "prg"], [s.name for s in spans(data)])
+
+    def test_nested(self):
+        """Confirm components nested within a program are not reported."""
+        data = b"""IE_VER := 2.1; CONTROLLER ctl
+        PROGRAM prg
+        TAG END_TAG
+        END_PROGRAM
+        TAG END_TAG
+        END_CONTROLLER"""
+        self.assertEqual(["PROGRAM", "TAG"], [s.keyword for s in spans(data)])
+
+    def test_end_in_structured_text(self):
+        """Confirm ending keywords within structured text are ignored."""
+        data = b"""IE_VER := 2.1; CONTROLLER ctl
+        PROGRAM prg
+        ST_ROUTINE r
+        'x := 1; // END_PROGRAM
+        END_ST_ROUTINE
+        END_PROGRAM
+        END_CONTROLLER"""
+        span = spans(data)[0]
+        self.assertTrue(
+            data[: span.end].endswith(b"END_ST_ROUTINE\n        END_PROGRAM")
+        )
+
+    def test_end_in_string(self):
+        """Confirm ending keywords within quoted strings are ignored."""
+        data = b"""IE_VER := 2.1; CONTROLLER ctl
+        TAG
+        t : DINT (Description := "END_TAG") := 0;
+        END_TAG
+        END_CONTROLLER"""
+        span = spans(data)[0]
+        self.assertEqual(data.rindex(b"END_TAG") + len(b"END_TAG"), span.end)
+
+    def test_unknown(self):
+        """Confirm an exception is raised for an unknown component."""
+        data = b"IE_VER := 2.1; CONTROLLER ctl FOO END_FOO END_CONTROLLER"
+        with self.assertRaises(scan.ScanError):
+            spans(data)
+
+    def test_unterminated(self):
+        """Confirm an exception is raised for a missing ending keyword."""
+        data = b"IE_VER := 2.1; CONTROLLER ctl TAG END_CONTROLLER"
+        with self.assertRaises(scan.ScanError):
+            spans(data)
@@ -0,0 +1,181 @@
+"""Unit tests for the spill module."""
+
+import gc
+import os
+import pickle
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import (
+    memory,
+    spill,
+    tag,
+)
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+DATATYPE udt
+DINT a;
+END_DATATYPE
+TAG
+t1 : udt := [1];
+t2 : DINT[100] := [{}];
+END_TAG
+PROGRAM prg
+TAG
+p : udt := [2];
+END_TAG
+END_PROGRAM
+END_CONTROLLER
+""".format(",".join(str(i) for i in range(100)))
+
+
+def all_tags(ctl):
+    """Lists tags of all scopes."""
+    tags = list(ctl.tags.values())
+    for prg in ctl.programs.values():
+        tags.extend(prg.tags.values())
+    return tags
+
+
+class Parse(unittest.TestCase):
+    """Tests for parsing with a spill budget."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.spill_dir = tmp.name
+
+    def test_spill_all(self):
+        """Confirm all values are spilled with a budget of zero."""
+        ctl = self.parse(spill_budget=0)
+        self.assertTrue(all(t.spilled for t in all_tags(ctl)))
+        self.assertEqual(l5k.parse_string(SOURCE), ctl)
+
+    def test_within_budget(self):
+        """Confirm no values are spilled if within the budget."""
+        ctl = self.parse(spill_budget=1 << 30)
+        self.assertFalse(any(t.spilled for t in all_tags(ctl)))
+        self.assertEqual([], os.listdir(self.spill_dir))
+
+    def test_budget_reached(self):
+        """Confirm values are spilled once the budget is reached."""
+        budget = memory.deep_size({"a": 1})
+        ctl = self.parse(spill_budget=budget)
+        self.assertFalse(ctl.tags["t1"].spilled)
+        self.assertTrue(ctl.tags["t2"].spilled)
+        self.assertEqual(list(range(100)), ctl.tags["t2"].value)
+
+    def test_removed(self):
+        """Confirm the store is removed once no longer referenced."""
+        ctl = self.parse(spill_budget=0)
+        self.assertEqual(1, len(os.listdir(self.spill_dir)))
+        del ctl
+        gc.collect()
+        self.assertEqual([], os.listdir(self.spill_dir))
+
+    def test_pipeline(self):
+        """Confirm values converted by a pipeline are spilled."""
+        ctl = self.parse(spill_budget=0, pipeline=1)
+        self.assertTrue(all(t.spilled for t in all_tags(ctl)))
+
+    def test_workers(self):
+        """Confirm values converted by workers are spilled."""
+        ctl = self.parse(spill_budget=0, workers=2, executor="thread")
+        self.assertTrue(ctl.programs["prg"].tags["p"].spilled)
+        self.assertEqual({"a": 2}, ctl.programs["prg"].tags["p"].value)
+
+    def test_feed(self):
+        """Confirm values passed to a FeedParser callback are spilled."""
+        received = []
+        parser = l5k.FeedParser(
+            lambda attr, name, obj: received.append(obj),
+            spill_budget=0,
+            spill_dir=self.spill_dir,
+        )
+        parser.feed(SOURCE.encode())
+        ctl = parser.close()
+        self.assertTrue(ctl.tags["t1"].spilled)
+
+    def test_raw(self):
+        """Confirm raw values are not spilled."""
+        ctl = self.parse(spill_budget=0, convert_values=False)
+        self.assertFalse(any(t.spilled for t in all_tags(ctl)))
+
+    def test_cache(self):
+        """Confirm spilled values are included in cached results."""
+        filename = os.path.join(self.spill_dir, "test.L5K")
+        with open(filename, "w", encoding="utf-8") as f:
+            f.write(SOURCE)
+        cache_dir = os.path.join(self.spill_dir, "cache")
+        options = {"cache_dir": cache_dir, "spill_budget": 0}
+        ctl = l5k.parse(filename, **options)
+        self.assertEqual(ctl, l5k.parse(filename, **options))
+
+    def parse(self, **options):
+        """Parses the source, spilling to the temporary directory."""
+        return l5k.parse_string(SOURCE, spill_dir=self.spill_dir, **options)
+
+
+class Parsed(unittest.TestCase):
+    """Tests for converting and spilling tags as they are parsed."""
+
+    def setUp(self):
+        self.spiller = spill.Spiller(0)
+        self.source = "TAG t : udt := [1]; END_TAG"
+
+    def test_spilled(self):
+        """Confirm tags are spilled by the parse action."""
+        self.spiller.datatypes = l5k.parse_string(SOURCE).datatype_table()
+        with spill.active(self.spiller):
+            ((_, t),) = l5k.grammar.TAG.parse_string(self.source)
+        self.assertTrue(t.spilled)
+        self.assertEqual({"a": 1}, t.value)
+
+    def test_no_datatypes(self):
+        """Confirm tags are not converted without data type definitions."""
+        with spill.active(self.spiller):
+            ((_, t),) = l5k.grammar.TAG.parse_string(self.source)
+        self.assertFalse(t.converted)
+
+    def test_parser(self):
+        """Confirm the parser provides data type definitions."""
+        with patch("l5k.spill.Spiller", return_value=self.spiller):
+            l5k.parse_string(SOURCE, spill_budget=0)
+        self.assertIn("udt", self.spiller.datatypes)
+
+
+class SpilledTag(unittest.TestCase):
+    """Tests for tags with spilled values."""
+
+    def setUp(self):
+        self.store = spill.Store()
+        self.addCleanup(self.store.close)
+        self.tag = tag.Tag("DINT", (2,), {}, [1, 2])
+        self.tag.spill(self.store)
+
+    def test_value(self):
+        """Confirm the value is loaded from the store."""
+        self.assertTrue(self.tag.spilled)
+        self.assertEqual([1, 2], self.tag.value)
+        self.assertNotIn("_value", vars(self.tag))
+
+    def test_assign(self):
+        """Confirm assigning a value replaces the spilled value."""
+        self.tag.value = [3, 4]
+        self.assertFalse(self.tag.spilled)
+        self.assertEqual([3, 4], self.tag.value)
+
+    def test_pickle(self):
+        """Confirm the value, instead of the store, is pickled."""
+        restored = pickle.loads(pickle.dumps(self.tag))
+        self.assertFalse(restored.spilled)
+        self.assertEqual(self.tag, restored)
+
+    def test_missing(self):
+        """Confirm a missing value raises AttributeError."""
+        del vars(self.tag)["_spilled"]
+        self.assertFalse(hasattr(self.tag, "value"))
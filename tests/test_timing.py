@@ -0,0 +1,128 @@
+"""Unit tests for the timing module."""
+
+import gzip
+import threading
+import unittest
+from unittest.mock import patch
+
+import l5k
+from l5k import timing
+
+
+SOURCE = """IE_VER := 2.1;
+CONTROLLER ctl
+DATATYPE udt
+DINT a;
+END_DATATYPE
+TAG
+t1 : udt := [1];
+t2 : udt := [2];
+t3 : DINT := 3;
+END_TAG
+PROGRAM prg
+END_PROGRAM
+END_CONTROLLER
+"""
+
+
+def collect(**options):
+    """Parses the source, returning the reported events by phase."""
+    events = {}
+    l5k.parse_string(
+        SOURCE,
+        on_event=lambda e: events.setdefault(e.phase, []).append(e),
+        **options,
+    )
+    return events
+
+
+class Events(unittest.TestCase):
+    """Tests for events reported while parsing."""
+
+    def test_parse(self):
+        """Confirm an event is reported for each stored component."""
+        events = {e.component: e for e in collect()["parse"]}
+        self.assertEqual(
+            {("DATATYPE", "udt"), ("TAG", None), ("PROGRAM", "prg")},
+            set(events),
+        )
+        self.assertEqual(3, events[("TAG", None)].objects)
+        self.assertEqual(
+            len("PROGRAM prg\nEND_PROGRAM"),
+            events[("PROGRAM", "prg")].nbytes,
+        )
+
+    def test_convert(self):
+        """Confirm conversion is reported by data type."""
+        events = {e.component: e.objects for e in collect()["convert"]}
+        self.assertEqual(
+            {("DATATYPE", "udt"): 2, ("DATATYPE", "DINT"): 1},
+            events,
+        )
+
+    def test_assemble(self):
+        """Confirm Controller construction is reported."""
+        (event,) = collect()["assemble"]
+        self.assertEqual(("CONTROLLER", "ctl"), event.component)
+        self.assertEqual(3, event.objects)
+
+    def test_scan(self):
+        """Confirm time spent locating components is reported."""
+        (event,) = collect()["scan"]
+        self.assertEqual(3, event.objects)
+
+    def test_read(self):
+        """Confirm waiting for decompressed content is reported."""
+        stats = l5k.ParseStats()
+        l5k.parse_bytes(gzip.compress(SOURCE.encode()), on_event=stats)
+        self.assertEqual(len(SOURCE), stats.totals()["read"].nbytes)
+
+    def test_complete_grammar(self):
+        """Confirm a source parsed with the complete grammar is reported."""
+        error = l5k.scan.ScanError
+        with patch("l5k.scan.components", side_effect=error):
+            events = collect()["parse"]
+        self.assertEqual([("CONTROLLER", None)], [e.component for e in events])
+
+    def test_workers(self):
+        """Confirm events measured by workers are reported by the caller."""
+        threads = set()
+
+        def on_event(event):
+            threads.add(threading.get_ident())
+            stats(event)
+
+        stats = l5k.ParseStats()
+        l5k.parse_string(SOURCE, workers=2, executor="thread", on_event=on_event)
+        self.assertIn(("PROGRAM", "prg"), [e.component for e in stats.slowest()])
+        self.assertEqual({threading.get_ident()}, threads)
+
+    def test_disabled(self):
+        """Confirm no measurements are taken without a callback."""
+        with patch("l5k.timing._Measurement") as measurement:
+            l5k.parse_string(SOURCE)
+        measurement.assert_not_called()
+
+
+class ParseStats(unittest.TestCase):
+    """Tests for accumulating events."""
+
+    def setUp(self):
+        self.stats = timing.ParseStats()
+        self.stats(timing.Event("parse", ("TAG", None), 1.0, 0.5, 10, 2))
+        self.stats(timing.Event("parse", ("PROGRAM", "p"), 3.0, 2.0, 20, 1))
+        self.stats(timing.Event("scan", None, 0.5, 0.5, 30, 2))
+
+    def test_totals(self):
+        """Confirm events are summed by phase."""
+        totals = self.stats.totals()
+        self.assertEqual(
+            timing.Event("parse", None, 4.0, 2.5, 30, 3),
+            totals["parse"],
+        )
+        self.assertEqual(0.5, totals["scan"].wall)
+
+    def test_slowest(self):
+        """Confirm the slowest events are listed first."""
+        slowest = self.stats.slowest(1)
+        self.assertEqual([("PROGRAM", "p")], [e.component for e in slowest])